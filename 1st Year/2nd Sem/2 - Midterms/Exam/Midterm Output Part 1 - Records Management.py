@@ -1,49 +1,224 @@
 import os
+import io
+import sys
 import csv
+import time
+import queue
+import pstats
+import cProfile
+import argparse
+import functools
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from itertools import islice
+from contextlib import contextmanager, nullcontext
+from collections import OrderedDict, deque
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 
-import pandas as pd
+try:
+    import fcntl
+except ImportError:     # Windows: no advisory locks, so run one app instance at a time
+    fcntl = None
+
+import numpy as np
 import matplotlib
 matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from analysis import (MAROON, MAROON2, YELLOW, WHITE, LGRAY, GRAY, DGRAY, BLACK,
+                      CHARTS, build_cube, load_dataset, analyze, draw_chart, risk_category,
+                      filter_values)
+
 # --------------------------------------------------
 # File paths (CSV files are in the same folder as this script)
 # --------------------------------------------------
 script_dir = os.path.dirname(os.path.abspath(__file__))
 DATASET_FILE = os.path.join(script_dir, "ai_job_replacement_2020_2026_v2.csv")
 RECORDS_FILE = os.path.join(script_dir, "custom_records.csv")
+RECORDS_DB   = os.path.join(script_dir, "custom_records.db")
+
+# Where My Records are kept: "csv" or "sqlite". The first time the SQLite
+# backend is used, the records in custom_records.csv are copied into it.
+RECORDS_BACKEND = "csv"
 
 
 # --------------------------------------------------
-# Colors and Fonts (MSEUF theme)
+# Fonts (the MSEUF colors live in analysis.py so the
+# headless charts match the app)
 # --------------------------------------------------
 
-MAROON  = "#7B0D1E"
-MAROON2 = "#5C0A16"
-YELLOW  = "#F5C518"
-WHITE   = "#FFFFFF"
-LGRAY   = "#F5F5F5"
-GRAY    = "#DDDDDD"
-DGRAY   = "#555555"
-BLACK   = "#111111"
-
 FONT       = ("Arial", 10)
 FONT_BOLD  = ("Arial", 10, "bold")
 FONT_TITLE = ("Arial", 14, "bold")
 FONT_SMALL = ("Arial", 9)
 
+ROW_HEIGHT = 24
+
+# The dataset table only keeps the visible rows (plus this many extra)
+# as Treeview items; the rest are fetched from numpy arrays on scroll.
+DS_BUFFER_ROWS = 10
+
+# Rendered charts kept in memory, and how often (ms) the Tk loop checks
+# for background jobs (chart data, analysis) that have finished.
+CHART_CACHE_SIZE = 5
+CHART_POLL_MS    = 30
+
+# How often (ms) My Records checks whether another app instance changed
+# the shared records file.
+RECORDS_POLL_MS = 2000
+
+# A sync that brings in at least this many new or changed records (the
+# first one at startup, an import) folds them into the analysis cube in
+# one batch instead of one row at a time.
+ANALYSIS_BATCH_MIN = 50
+
+# How many rejected rows an import lists in its warning dialog.
+IMPORT_REJECTS_SHOWN = 20
+
+# How many timed actions the Diagnostics tab (Ctrl+Shift+D) keeps, and
+# how many functions --cprofile prints per action.
+PROFILE_HISTORY   = 500
+PROFILE_TOP_FUNCS = 15
+
+# Filter changes wait this long (ms) for the user to stop clicking
+# before the dataset table or the analysis is recomputed.
+FILTER_DEBOUNCE_MS = 250
+
 
 # ==================================================
-# PART I - OOP: Data classes and CSV handling
+# Instrumentation
+# ==================================================
+
+class TimedAction:
+    __slots__ = ("action", "started", "seconds", "rows")
+
+    def __init__(self, action, rows=None):
+        self.action  = action
+        self.started = time.time()
+        self.seconds = 0.0
+        self.rows    = rows
+
+
+class Timings:
+    """The last PROFILE_HISTORY timed actions, kept in a ring buffer.
+
+    Time a block with measure() or a function with @instrumented. When
+    profile is on, each action also runs under cProfile (one at a time,
+    nested and concurrent actions are only timed) and the stats are
+    added up per action.
+    """
+
+    def __init__(self, size=PROFILE_HISTORY):
+        self.entries  = deque(maxlen=size)
+        self.profile  = False
+        self.profiles = {}
+        self._lock     = threading.Lock()
+        self._profiler = threading.Lock()
+
+    @contextmanager
+    def measure(self, action, rows=None):
+        """Time the with-block; set .rows on the yielded entry if only known at the end."""
+        entry = TimedAction(action, rows)
+        profiler = None
+        if self.profile and self._profiler.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry.seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._profiler.release()
+            with self._lock:
+                self.entries.append(entry)
+                if profiler is not None:
+                    if action in self.profiles:
+                        self.profiles[action].add(profiler)
+                    else:
+                        self.profiles[action] = pstats.Stats(profiler)
+
+    def recent(self):
+        with self._lock:
+            return list(self.entries)
+
+    def summary(self):
+        """(action, calls, total s, mean s, max s, last rows) per action, slowest total first."""
+        stats = {}
+        for e in self.recent():
+            calls, total, worst, _ = stats.get(e.action, (0, 0.0, 0.0, None))
+            stats[e.action] = (calls + 1, total + e.seconds, max(worst, e.seconds), e.rows)
+        return sorted(((action, calls, total, total / calls, worst, rows)
+                       for action, (calls, total, worst, rows) in stats.items()),
+                      key=lambda s: s[2], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.profiles.clear()
+
+    def report(self, out=sys.stdout):
+        out.write(f"{'Action':<40} {'Calls':>6} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9} {'Rows':>10}\n")
+        for action, calls, total, mean, worst, rows in self.summary():
+            rows = f"{rows:,}" if rows is not None else ""
+            out.write(f"{action:<40} {calls:>6} {total * 1000:>10.1f} {mean * 1000:>9.1f} "
+                      f"{worst * 1000:>9.1f} {rows:>10}\n")
+
+    def dump_profiles(self, directory, out=sys.stdout):
+        """Write one .prof per action (for pstats/snakeviz) and print each one's top functions."""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            profiles = dict(self.profiles)
+        for action, stats in profiles.items():
+            name = "".join(c if c.isalnum() else "_" for c in action) + ".prof"
+            stats.dump_stats(os.path.join(directory, name))
+            out.write(f"\n=== {action} ({name}) ===\n")
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCS)
+
+
+TIMINGS = Timings()
+
+
+def instrumented(action=None, rows=None):
+    """Record every call of the decorated function in TIMINGS.
+
+    action defaults to the function's qualified name; rows, if given, is
+    called on the return value to get the row count.
+    """
+    def decorate(func):
+        name = action or func.__qualname__
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with TIMINGS.measure(name) as entry:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    entry.rows = rows(result)
+            return result
+        return timed
+    return decorate
+
+
+# ==================================================
+# PART I - OOP: Data classes and record storage
 # ==================================================
 
 class JobRecord:
     FIELDS = ["ID", "Job Role", "Industry", "Country",
               "Year", "Risk %", "AI Score", "Salary (USD)", "Notes", "Date Added"]
+    REQUIRED = FIELDS[:8]
+    NUMERIC  = {"Year": int, "Risk %": float, "AI Score": float, "Salary (USD)": float}
+
+    # No per-instance __dict__: saves a few hundred bytes per record.
+    __slots__ = ("rid", "job_role", "industry", "country", "year",
+                 "risk", "ai_score", "salary", "notes", "date_added")
 
     def __init__(self, rid, job_role, industry, country,
                  year, risk, ai_score, salary, notes="", date_added=None):
@@ -72,6 +247,11 @@ class JobRecord:
             "Date Added": self.date_added
         }
 
+    def to_row(self):
+        """The values in FIELDS order, for csv.writer."""
+        return (self.rid, self.job_role, self.industry, self.country, self.year,
+                self.risk, self.ai_score, self.salary, self.notes, self.date_added)
+
     @classmethod
     def from_dict(cls, d):
         return cls(
@@ -80,40 +260,871 @@ class JobRecord:
             d.get("Notes", ""), d.get("Date Added", "")
         )
 
+    def analysis_row(self):
+        """This record as a dataset row for AggregateCube.add_row.
+
+        None if the year or risk % isn't a number, since the record then has
+        no analysis group; other values that aren't numbers count as missing.
+        """
+        try:
+            year, risk = int(self.year), float(self.risk)
+        except ValueError:
+            return None
+        if not np.isfinite(risk):
+            return None
+
+        def number(text):
+            try:
+                return float(text)
+            except ValueError:
+                return float("nan")
+
+        return {
+            "year":                     year,
+            "industry":                 self.industry,
+            "country":                  self.country,
+            "job_role":                 self.job_role,
+            "automation_risk_category": risk_category(risk),
+            "automation_risk_percent":  risk,
+            "ai_replacement_score":     number(self.ai_score),
+            "salary_before_usd":        number(self.salary),
+        }
+
+    @classmethod
+    def validate(cls, row):
+        """Return why a CSV row can't become a record, or None if it can."""
+        if None in row:
+            return "too many values"
+        if None in row.values():
+            return "too few values"
+        for field in cls.REQUIRED:
+            if not row[field].strip():
+                return f"'{field}' is empty"
+        for field, kind in cls.NUMERIC.items():
+            try:
+                kind(row[field])
+            except ValueError:
+                return f"'{field}' is not a number: {row[field].strip()!r}"
+        return None
+
+
+class _StringPool(dict):
+    """Maps each distinct string to a small int code; values[code] gives it back."""
+
+    def __init__(self):
+        super().__init__()
+        self.values = []
+
+    def __missing__(self, value):
+        code = self[value] = len(self.values)
+        self.values.append(value)
+        return code
+
+
+class RecordTable:
+    """Column-oriented container for many records.
+
+    Each field is stored as one column instead of one JobRecord per row.
+    Fields that repeat a lot keep each distinct string once in a pool and
+    store 4-byte codes into it. JobRecord objects are only built when a
+    row is asked for, and rows() feeds csv.writer directly.
+    """
+
+    POOLED = ("Job Role", "Industry", "Country", "Year",
+              "Risk %", "AI Score", "Date Added")
+    CHUNK  = 8192      # rows transposed into columns at a time
+
+    def __init__(self, records=()):
+        self._pools   = [_StringPool() if f in self.POOLED else None
+                         for f in JobRecord.FIELDS]
+        self._columns = [array("I") if pool is not None else []
+                         for pool in self._pools]
+        self.extend_rows(r.to_row() for r in records)
+
+    @classmethod
+    def from_rows(cls, rows):
+        table = cls()
+        table.extend_rows(rows)
+        return table
+
+    def extend_rows(self, rows):
+        """Append rows given as sequences of strings in FIELDS order."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.CHUNK))
+            if not chunk:
+                return
+            for column, pool, values in zip(self._columns, self._pools, zip(*chunk)):
+                if pool is None:
+                    column.extend(values)
+                else:
+                    column.extend(map(pool.__getitem__, values))
+
+    def append(self, record):
+        self.extend_rows([record.to_row()])
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def row(self, i):
+        return tuple(column[i] if pool is None else pool.values[column[i]]
+                     for column, pool in zip(self._columns, self._pools))
+
+    def __getitem__(self, i):
+        return JobRecord(*self.row(i))
+
+    def __iter__(self):
+        return (JobRecord(*row) for row in self.rows())
+
+    def column(self, field):
+        i = JobRecord.FIELDS.index(field)
+        column, pool = self._columns[i], self._pools[i]
+        return list(column) if pool is None else [pool.values[c] for c in column]
+
+    def rows(self):
+        return zip(*(column if pool is None else map(pool.values.__getitem__, column)
+                     for column, pool in zip(self._columns, self._pools)))
+
+
+class RecordRepository(ABC):
+    """What RecordManager needs from a storage backend.
+
+    A backend must implement load_all, save_all, append_record, delete and
+    update (one that doesn't can't be instantiated); everything else has a
+    working (if slow) default built on those.
+    """
+
+    @abstractmethod
+    def load_all(self):
+        """All records, in the order they were added."""
+
+    @abstractmethod
+    def save_all(self, records):
+        """Replace every stored record with these."""
+
+    @abstractmethod
+    def append_record(self, record):
+        """Store one more record."""
+
+    @abstractmethod
+    def delete(self, rid):
+        """Remove the record; returns False if there was none."""
+
+    @abstractmethod
+    def update(self, record):
+        """Replace the record with the same ID; returns False if there was none."""
+
+    def is_stale(self):
+        """True if the storage changed since this object last read it."""
+        return False
+
+    def exclusive(self):
+        """Context manager keeping other writers out across several calls."""
+        return nullcontext()
+
+    def append_many(self, records):
+        count = 0
+        for r in records:
+            self.append_record(r)
+            count += 1
+        return count
+
+    def iter_all(self):
+        return iter(self.load_all())
+
+    def load_table(self):
+        return RecordTable(self.iter_all())
+
+    def save_table(self, table):
+        self.save_all(list(table))
+
+    def ids(self):
+        return {r.rid for r in self.iter_all()}
+
+    def id_exists(self, rid):
+        return any(r.rid == str(rid) for r in self.iter_all())
+
+    def get_record(self, rid):
+        for r in self.iter_all():
+            if r.rid == str(rid):
+                return r
+        return None
+
+    def search_by_name(self, query, prefix=False):
+        query = query.lower()
+        if prefix:
+            return [r for r in self.iter_all()
+                    if r.job_role.lower().startswith(query) or r.country.lower().startswith(query)]
+        return [r for r in self.iter_all()
+                if query in r.job_role.lower() or query in r.country.lower()]
+
+
+def _read_locked(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _write_locked(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock(exclusive=True):
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class CSVRepository(RecordRepository):
+    """Records in a CSV file that several app instances may share.
+
+    Every read holds a shared fcntl lock on ``<file>.lock`` and every
+    change holds an exclusive one, so a delete can't overlap an append
+    from another process. Full rewrites go to a temp file that is
+    renamed over the CSV.
+    """
 
-class CSVRepository:
     def __init__(self, filepath):
-        self.filepath = filepath
+        self.filepath  = filepath
+        self.lock_path = filepath + ".lock"
+        self._lock_depth     = 0
+        self._lock_exclusive = False
         self._create_if_not_exists()
 
+    @contextmanager
+    def _lock(self, exclusive=False):
+        # Re-entrant: methods that call other locked methods keep the outer lock.
+        if self._lock_depth:
+            if exclusive and not self._lock_exclusive:
+                raise RuntimeError("can't upgrade a shared records lock")
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth, self._lock_exclusive = 1, exclusive
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def exclusive(self):
+        return self._lock(exclusive=True)
+
+    @_write_locked
     def _create_if_not_exists(self):
         if not os.path.exists(self.filepath):
-            with open(self.filepath, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=JobRecord.FIELDS)
-                writer.writeheader()
-
+            self._write_atomic([])
+
+    @staticmethod
+    def _read_rows(f):
+        """Yield the data rows of a records CSV as lists in FIELDS order."""
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        n = len(JobRecord.FIELDS)
+        if header == JobRecord.FIELDS:
+            for row in reader:
+                if len(row) == n:
+                    yield row
+                elif row:
+                    yield (row + [""] * n)[:n]
+            return
+        # Columns in another order, or Notes / Date Added missing.
+        positions = [header.index(f) if f in header else None for f in JobRecord.FIELDS]
+        for row in reader:
+            if row:
+                yield [row[i] if i is not None and i < len(row) else "" for i in positions]
+
+    @instrumented(rows=len)
+    @_read_locked
     def load_all(self):
-        records = []
         with open(self.filepath, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                records.append(JobRecord.from_dict(row))
-        return records
+            return [JobRecord(*row) for row in self._read_rows(f)]
+
+    @_read_locked
+    def load_table(self):
+        with open(self.filepath, "r", newline="", encoding="utf-8") as f:
+            return RecordTable.from_rows(self._read_rows(f))
 
+    @_write_locked
     def save_all(self, records):
-        with open(self.filepath, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=JobRecord.FIELDS)
-            writer.writeheader()
-            for r in records:
-                writer.writerow(r.to_dict())
+        self._write_atomic(r.to_row() for r in records)
+
+    @_write_locked
+    def save_table(self, table):
+        self._write_atomic(table.rows())
 
+    @_write_locked
     def append_record(self, record):
         with open(self.filepath, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=JobRecord.FIELDS)
-            writer.writerow(record.to_dict())
+            csv.writer(f).writerow(record.to_row())
+
+    @_write_locked
+    def append_many(self, records):
+        """Append records (any iterable) in one buffered write; returns the count."""
+        count = 0
+        with open(self.filepath, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for r in records:
+                writer.writerow(r.to_row())
+                count += 1
+        return count
+
+    def iter_all(self):
+        with self._lock(), open(self.filepath, "r", newline="", encoding="utf-8") as f:
+            for row in self._read_rows(f):
+                yield JobRecord(*row)
+
+    @_write_locked
+    def delete(self, rid):
+        records = self.load_all()
+        filtered = [r for r in records if r.rid != str(rid)]
+        if len(filtered) == len(records):
+            return False
+        self.save_all(filtered)
+        return True
+
+    @_write_locked
+    def update(self, record):
+        records = self.load_all()
+        found = False
+        for i, r in enumerate(records):
+            if r.rid == record.rid:
+                records[i] = record
+                found = True
+        if found:
+            self.save_all(records)
+        return found
+
+    def _write_atomic(self, rows):
+        # Write next to the real file, then swap it in with one rename so a
+        # crash (or a reader in another process) never sees a half-written
+        # custom_records.csv. Call with the exclusive lock held.
+        folder = os.path.dirname(os.path.abspath(self.filepath))
+        fd, tmp_path = tempfile.mkstemp(prefix=".records-", suffix=".tmp", dir=folder)
+        try:
+            # mkstemp makes the file private; keep the shared file's permissions.
+            if os.path.exists(self.filepath):
+                os.chmod(tmp_path, os.stat(self.filepath).st_mode & 0o777)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_path, 0o666 & ~umask)
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(JobRecord.FIELDS)
+                writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SearchIndex:
+    """Substring/prefix index over job role and country.
+
+    Records rarely have many distinct roles or countries, so the index
+    works on distinct lower-cased values: each value is indexed by its
+    1- to 3-character n-grams, and each value maps to the set of IDs that
+    use it. A query's n-grams give candidate values, the candidates are
+    checked with ``in``/``startswith``, and the records using the values
+    that match are returned in file order. Results are exactly those of
+    CSVRepository.search_by_name.
+    """
+
+    N = 3
+
+    def __init__(self):
+        self._grams   = {}    # n-gram -> set of values containing it
+        self._ids     = {}    # value -> set of IDs using it
+        self._entries = {}    # ID -> (role, country, record), in file order
+        self._seq     = {}    # ID -> position, to sort small results into file order
+        self._next    = 0
+
+    def _ngrams(self, text):
+        return {text[i:i + n]
+                for n in range(1, self.N + 1)
+                for i in range(len(text) - n + 1)}
+
+    def _link(self, value, rid):
+        ids = self._ids.get(value)
+        if ids is None:
+            ids = self._ids[value] = set()
+            for gram in self._ngrams(value):
+                self._grams.setdefault(gram, set()).add(value)
+        ids.add(rid)
+
+    def _unlink(self, value, rid):
+        ids = self._ids[value]
+        ids.discard(rid)
+        if not ids:
+            del self._ids[value]
+            for gram in self._ngrams(value):
+                self._grams[gram].discard(value)
+                if not self._grams[gram]:
+                    del self._grams[gram]
+
+    def add(self, record):
+        """Index a record, or re-index it in place if its ID is known."""
+        rid = record.rid
+        if rid in self._entries:
+            for value in set(self._entries[rid][:2]):
+                self._unlink(value, rid)
+        else:
+            self._seq[rid] = self._next
+            self._next += 1
+        role, country = record.job_role.lower(), record.country.lower()
+        self._entries[rid] = (role, country, record)
+        for value in {role, country}:
+            self._link(value, rid)
+
+    def remove(self, rid):
+        entry = self._entries.pop(rid, None)
+        if entry is None:
+            return
+        for value in set(entry[:2]):
+            self._unlink(value, rid)
+        del self._seq[rid]
+
+    def search(self, query, prefix=False):
+        """Records whose role or country contains (or starts with) the query."""
+        query = query.lower()
+        if not query:
+            return [record for _, _, record in self._entries.values()]
+
+        if len(query) <= self.N:
+            candidates = self._grams.get(query, set())
+        else:
+            postings = sorted((self._grams.get(query[i:i + self.N], set())
+                               for i in range(len(query) - self.N + 1)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+
+        matched = {value for value in candidates
+                   if (value.startswith(query) if prefix else query in value)}
+        hits = sum(len(self._ids[value]) for value in matched)
+
+        # Sorting a big union costs more than one pass over the entries,
+        # which are already in file order.
+        if hits > len(self._entries) // 8:
+            return [record for role, country, record in self._entries.values()
+                    if role in matched or country in matched]
+        ids = set().union(*(self._ids[value] for value in matched))
+        return [self._entries[rid][2] for rid in sorted(ids, key=self._seq.__getitem__)]
+
+
+class CachedCSVRepository(CSVRepository):
+    """Keeps the CSV in memory with a dict index keyed by ID.
+
+    The file's (inode, mtime, size) works as a version number: every call
+    compares it with the version the cache was built from, under the
+    file lock, and parses the file again if another app instance (or an
+    editor) changed it. Changes are therefore always applied on top of
+    the latest records.
+    """
+
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self._index = {}
+        self._search = SearchIndex()
+        self._signature = None
+
+    def _file_signature(self):
+        st = os.stat(self.filepath)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _synced(self):
+        # Call after our own write: the cache matches the file again.
+        self._signature = self._file_signature()
+
+    def is_stale(self):
+        return self._file_signature() != self._signature
+
+    # The ID dict and the search index are only changed through these.
+    def _reset_index(self, records):
+        self._index = {}
+        self._search = SearchIndex()
+        for r in records:
+            if r.rid not in self._index:
+                self._put(r)
+
+    def _put(self, record):
+        self._index[record.rid] = record
+        self._search.add(record)
+
+    def _drop(self, rid):
+        self._index.pop(rid, None)
+        self._search.remove(rid)
+
+    def _refresh(self):
+        sig = self._file_signature()
+        if sig == self._signature:
+            return
+        self._reset_index(super().load_all())
+        self._signature = sig
+
+    @_read_locked
+    def load_all(self):
+        self._refresh()
+        return list(self._index.values())
+
+    @_write_locked
+    def save_all(self, records):
+        records = list(records)
+        super().save_all(records)
+        self._reset_index(records)
+        self._synced()
+
+    def _write_through(self):
+        CSVRepository.save_all(self, list(self._index.values()))
+        self._synced()
+
+    @_write_locked
+    def append_record(self, record):
+        self._refresh()
+        super().append_record(record)
+        if record.rid not in self._index:
+            self._put(record)
+        self._synced()
+
+    @_write_locked
+    def append_many(self, records):
+        self._refresh()
+
+        def indexed():
+            for r in records:
+                if r.rid not in self._index:
+                    self._put(r)
+                yield r
+        count = super().append_many(indexed())
+        self._synced()
+        return count
+
+    @_read_locked
+    def iter_all(self):
+        self._refresh()
+        return iter(list(self._index.values()))
+
+    def load_table(self):
+        return RecordRepository.load_table(self)
+
+    def save_table(self, table):
+        # The index holds records anyway, so there is nothing to save by
+        # writing the columns directly.
+        RecordRepository.save_table(self, table)
+
+    @_read_locked
+    def ids(self):
+        self._refresh()
+        return set(self._index)
+
+    @_read_locked
+    def id_exists(self, rid):
+        self._refresh()
+        return str(rid) in self._index
+
+    @_read_locked
+    def get_record(self, rid):
+        self._refresh()
+        return self._index.get(str(rid))
+
+    @_write_locked
+    def delete(self, rid):
+        self._refresh()
+        if str(rid) not in self._index:
+            return False
+        self._drop(str(rid))
+        self._write_through()
+        return True
+
+    @_write_locked
+    def update(self, record):
+        self._refresh()
+        if record.rid not in self._index:
+            return False
+        self._put(record)
+        self._write_through()
+        return True
+
+    @_read_locked
+    def search_by_name(self, query, prefix=False):
+        self._refresh()
+        return self._search.search(query, prefix)
+
+
+class JournaledCSVRepository(CachedCSVRepository):
+    """Appends adds, updates and deletes to a journal next to the CSV.
+
+    The base file is left alone until the journal reaches
+    ``compact_threshold`` entries; then the replayed records are written
+    back in one atomic rewrite and the journal is emptied. Replaying is
+    idempotent, so a crash between the rename and the journal truncate
+    is harmless.
+
+    While the base file is unchanged, the journal only ever grows, so
+    changes made by other app instances are picked up by replaying just
+    the entries past the last byte this instance read.
+    """
+
+    JOURNAL_FIELDS = ["Op"] + JobRecord.FIELDS
+    OP_ADD, OP_UPDATE, OP_DELETE = "A", "U", "D"
+
+    def __init__(self, filepath, compact_threshold=500):
+        self.journal_path = filepath + ".journal"
+        self.compact_threshold = compact_threshold
+        self._journal_len    = 0
+        self._journal_offset = 0        # bytes of the journal already replayed
+        self._base_signature = None
+        super().__init__(filepath)
+        with self._lock(exclusive=True):
+            if not os.path.exists(self.journal_path):
+                self._reset_journal()
+
+    def _reset_journal(self):
+        with open(self.journal_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(self.JOURNAL_FIELDS)
+        self._journal_len = 0
+
+    def _file_signature(self):
+        return super()._file_signature() + (os.path.getsize(self.journal_path),)
+
+    def _synced(self):
+        super()._synced()
+        self._base_signature = self._signature[:3]
+        self._journal_offset = self._signature[3]
+
+    def _refresh(self):
+        sig = self._file_signature()
+        if sig == self._signature:
+            return
+        if sig[:3] != self._base_signature or sig[3] < self._journal_offset:
+            # The base was rewritten (compaction, save_all or an editor).
+            self._reset_index(CSVRepository.load_all(self))
+            self._journal_len    = 0
+            self._journal_offset = 0
+        self._replay_journal()
+        self._signature      = sig
+        self._base_signature = sig[:3]
+
+    def _replay_journal(self):
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            data = f.read()
+        rows = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+        if self._journal_offset == 0:
+            next(rows, None)    # header
+        for row in rows:
+            if len(row) == len(self.JOURNAL_FIELDS):
+                self._apply(row[0], JobRecord(*row[1:]))
+                self._journal_len += 1
+        self._journal_offset += len(data)
+
+    def _apply(self, op, record):
+        if op == self.OP_DELETE:
+            self._drop(record.rid)
+        else:
+            self._put(record)
+
+    def _log(self, op, record):
+        self._log_many(op, [record])
+
+    def _log_many(self, op, records):
+        count = 0
+        with open(self.journal_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.JOURNAL_FIELDS)
+            for record in records:
+                row = record.to_dict()
+                row["Op"] = op
+                writer.writerow(row)
+                self._apply(op, record)
+                count += 1
+        self._journal_len += count
+        self._synced()
+        if self._journal_len >= self.compact_threshold:
+            self.compact()
+        return count
+
+    @_write_locked
+    def compact(self):
+        self._refresh()
+        self._write_atomic(r.to_row() for r in self._index.values())
+        self._reset_journal()
+        self._synced()
+
+    @_write_locked
+    def save_all(self, records):
+        records = list(records)
+        self._write_atomic(r.to_row() for r in records)
+        self._reset_journal()
+        self._reset_index(records)
+        self._synced()
+
+    @_write_locked
+    def append_record(self, record):
+        self._refresh()
+        self._log(self.OP_ADD, record)
+
+    @_write_locked
+    def append_many(self, records):
+        self._refresh()
+        return self._log_many(self.OP_ADD, records)
+
+    @_write_locked
+    def delete(self, rid):
+        self._refresh()
+        record = self._index.get(str(rid))
+        if record is None:
+            return False
+        self._log(self.OP_DELETE, record)
+        return True
+
+    @_write_locked
+    def update(self, record):
+        self._refresh()
+        if record.rid not in self._index:
+            return False
+        self._log(self.OP_UPDATE, record)
+        return True
+
+
+class SQLiteRepository(RecordRepository):
+    """Keeps the records in an SQLite database.
+
+    Values are stored as text, exactly as the CSV holds them, and rows
+    come back in the order they were added. ID is unique, and year and
+    lower-cased copies of job role and country are indexed; searching the
+    lower-cased copies gives the same matches as str.lower() in Python,
+    and prefix searches can use their index. The database runs in WAL
+    mode, and bulk appends are committed BATCH_SIZE rows at a time;
+    save_all replaces the records in a single transaction.
+    """
+
+    BATCH_SIZE = 5000
+    COLUMNS    = ", ".join(JobRecord.__slots__)
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    seq        INTEGER PRIMARY KEY,
+                    rid        TEXT NOT NULL UNIQUE,
+                    job_role   TEXT NOT NULL,
+                    industry   TEXT NOT NULL,
+                    country    TEXT NOT NULL,
+                    year       TEXT NOT NULL,
+                    risk       TEXT NOT NULL,
+                    ai_score   TEXT NOT NULL,
+                    salary     TEXT NOT NULL,
+                    notes      TEXT NOT NULL,
+                    date_added TEXT NOT NULL,
+                    role_key    TEXT NOT NULL COLLATE NOCASE,
+                    country_key TEXT NOT NULL COLLATE NOCASE
+                )
+            """)
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_records_role    ON records (role_key)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_records_country ON records (country_key)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_records_year    ON records (year)")
+
+    def close(self):
+        self.db.close()
+
+    def _select(self, where="", params=()):
+        return self.db.execute(
+            f"SELECT {self.COLUMNS} FROM records {where} ORDER BY seq", params)
+
+    @staticmethod
+    def _keyed_row(record):
+        return record.to_row() + (record.job_role.lower(), record.country.lower())
+
+    def _insert_batches(self, records, commit=True):
+        # INSERT OR IGNORE: like the CSV cache, the first record with an ID wins.
+        # commit=False leaves every batch to the caller's transaction.
+        sql = (f"INSERT OR IGNORE INTO records ({self.COLUMNS}, role_key, country_key) "
+               f"VALUES ({', '.join('?' * 12)})")
+        records = iter(records)
+        count = 0
+        while True:
+            batch = [self._keyed_row(r) for r in islice(records, self.BATCH_SIZE)]
+            if not batch:
+                return count
+            with self.db if commit else nullcontext():
+                self.db.executemany(sql, batch)
+            count += len(batch)
+
+    def load_all(self):
+        return [JobRecord(*row) for row in self._select()]
+
+    def iter_all(self):
+        return (JobRecord(*row) for row in self._select())
+
+    def load_table(self):
+        return RecordTable.from_rows(self._select())
+
+    def save_all(self, records):
+        # One transaction: if any insert fails, the old records are kept.
+        with self.db:
+            self.db.execute("DELETE FROM records")
+            self._insert_batches(records, commit=False)
+
+    def save_table(self, table):
+        self.save_all(JobRecord(*row) for row in table.rows())
+
+    def append_record(self, record):
+        self._insert_batches([record])
+
+    def append_many(self, records):
+        return self._insert_batches(records)
+
+    def ids(self):
+        return {rid for (rid,) in self.db.execute("SELECT rid FROM records")}
 
     def id_exists(self, rid):
-        return any(r.rid == str(rid) for r in self.load_all())
+        return self.db.execute("SELECT 1 FROM records WHERE rid = ?", (str(rid),)).fetchone() is not None
+
+    def get_record(self, rid):
+        row = self._select("WHERE rid = ?", (str(rid),)).fetchone()
+        return JobRecord(*row) if row else None
+
+    def delete(self, rid):
+        with self.db:
+            return self.db.execute("DELETE FROM records WHERE rid = ?", (str(rid),)).rowcount > 0
+
+    def update(self, record):
+        row = self._keyed_row(record)
+        assignments = ", ".join(f"{col} = ?" for col in JobRecord.__slots__[1:] + ("role_key", "country_key"))
+        with self.db:
+            return self.db.execute(f"UPDATE records SET {assignments} WHERE rid = ?",
+                                   row[1:] + row[:1]).rowcount > 0
+
+    def search_by_name(self, query, prefix=False):
+        pattern = query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = pattern + "%" if prefix else "%" + pattern + "%"
+        where = "WHERE role_key LIKE ? ESCAPE '\\' OR country_key LIKE ? ESCAPE '\\'"
+        return [JobRecord(*row) for row in self._select(where, (pattern, pattern))]
+
+
+def migrate_records(source, target):
+    """Copy every record from one repository into another; returns the count."""
+    records = source.load_all()
+    target.save_all(records)
+    return len(records)
 
 
 class RecordManager:
@@ -122,35 +1133,74 @@ class RecordManager:
 
     def add_record(self, rid, job_role, industry, country,
                    year, risk, ai_score, salary, notes):
-        if self.repo.id_exists(rid):
-            return False, f"ID '{rid}' already exists."
         new_rec = JobRecord(rid, job_role, industry, country,
                             year, risk, ai_score, salary, notes)
-        self.repo.append_record(new_rec)
+        with self.repo.exclusive():
+            if self.repo.id_exists(rid):
+                return False, f"ID '{rid}' already exists."
+            self.repo.append_record(new_rec)
         return True, f"Record added! (ID: {rid})"
 
     def get_all_records(self):
         return self.repo.load_all()
 
     def search_by_id(self, rid):
-        for r in self.repo.load_all():
-            if r.rid == str(rid):
-                return r
-        return None
+        return self.repo.get_record(rid)
 
-    def search_by_name(self, query):
-        query = query.lower()
-        return [r for r in self.repo.load_all()
-                if query in r.job_role.lower() or query in r.country.lower()]
+    def search_by_name(self, query, prefix=False):
+        return self.repo.search_by_name(query, prefix)
 
     def delete_record(self, rid):
-        records = self.repo.load_all()
-        filtered = [r for r in records if r.rid != str(rid)]
-        if len(filtered) == len(records):
+        if not self.repo.delete(rid):
             return False, f"No record found with ID '{rid}'."
-        self.repo.save_all(filtered)
         return True, f"Record '{rid}' deleted."
 
+    def import_csv(self, path):
+        """Add every valid row of a CSV file; returns (added, rejects).
+
+        The file is streamed, checked row by row and appended in one
+        write. rejects lists (line number, reason) for each skipped row.
+        """
+        rejects = []
+        # utf-8-sig: Excel's "CSV UTF-8" starts the file with a BOM.
+        with open(path, "r", newline="", encoding="utf-8-sig") as f, self.repo.exclusive():
+            reader  = csv.DictReader(f)
+            missing = [c for c in JobRecord.REQUIRED if c not in (reader.fieldnames or [])]
+            if missing:
+                return 0, [(1, "missing column(s): " + ", ".join(missing))]
+            seen = self.repo.ids()
+
+            def accepted():
+                for row in reader:
+                    error = JobRecord.validate(row)
+                    if error is None and row["ID"].strip() in seen:
+                        error = f"duplicate ID '{row['ID'].strip()}'"
+                    if error is not None:
+                        rejects.append((reader.line_num, error))
+                        continue
+                    record = JobRecord.from_dict(row)
+                    seen.add(record.rid)
+                    yield record
+            added = self.repo.append_many(accepted())
+        return added, rejects
+
+    def export_csv(self, path, columns=None):
+        """Write the records to a CSV, optionally only some columns; returns the count."""
+        columns = list(columns or JobRecord.FIELDS)
+        unknown = [c for c in columns if c not in JobRecord.FIELDS]
+        if unknown:
+            raise ValueError("Unknown column(s): " + ", ".join(unknown))
+        positions = [JobRecord.FIELDS.index(c) for c in columns]
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for r in self.repo.iter_all():
+                row = r.to_row()
+                writer.writerow([row[i] for i in positions])
+                count += 1
+        return count
+
 
 # ==================================================
 # MAIN APPLICATION
@@ -158,27 +1208,61 @@ class RecordManager:
 
 class App(tk.Tk):
 
-    def __init__(self):
+    def __init__(self, diagnostics=False):
         super().__init__()
         self.title("AI Job Displacement - Record Management System")
         self.geometry("1100x700")
         self.configure(bg=LGRAY)
         self.resizable(True, True)
 
-        self.repo    = CSVRepository(RECORDS_FILE)
+        self.repo    = self._open_repository()
         self.manager = RecordManager(self.repo)
         self.df      = self._load_dataset()
+        self.cube    = self._build_cube()
+        # Rendered charts are cached under (chart name, dataset_version).
+        # Charts are drawn from self.df and self.cube only, so the version
+        # changes with the dataset, never with My Records.
+        self.dataset_version = 0
+
+        # The Data Analysis tab counts My Records too, in its own copy of
+        # the cube (charts stay on the dataset). Records go in and out one
+        # at a time: _analysis_rows maps ID -> (record row, analysis row).
+        self.analysis_cube  = self.cube.copy() if self.cube is not None else None
+        self._analysis_rows = {}
+        self._analysis_lock = threading.Lock()
+        self._sync_analysis()
+
+        # Debounce timers and background jobs, both keyed by name.
+        self._after_ids    = {}
+        self._job_gen      = {}
+        self._job_results  = queue.Queue()
+        self._jobs_running = 0
 
         self._setup_styles()
         self._build_header()
         self._build_tabs()
 
+        # Hidden until Ctrl+Shift+D (or --profile).
+        self.bind("<Control-D>", self._toggle_diagnostics)
+        if diagnostics:
+            self._toggle_diagnostics()
+
+    def _open_repository(self):
+        if RECORDS_BACKEND != "sqlite":
+            return JournaledCSVRepository(RECORDS_FILE)
+        first_run = not os.path.exists(RECORDS_DB)
+        repo = SQLiteRepository(RECORDS_DB)
+        if first_run and os.path.exists(RECORDS_FILE):
+            migrate_records(JournaledCSVRepository(RECORDS_FILE), repo)
+        return repo
+
+    @instrumented(rows=len)
     def _load_dataset(self):
-        if os.path.exists(DATASET_FILE):
-            df = pd.read_csv(DATASET_FILE)
-            df.columns = df.columns.str.strip()
-            return df
-        return pd.DataFrame()
+        return load_dataset(DATASET_FILE)
+
+    @instrumented()
+    def _build_cube(self):
+        return build_cube(self.df) if not self.df.empty else None
 
     def _setup_styles(self):
         style = ttk.Style(self)
@@ -192,7 +1276,7 @@ class App(tk.Tk):
                   foreground=[("selected", WHITE)])
 
         style.configure("Treeview",         background=WHITE, foreground=BLACK,
-                        fieldbackground=WHITE, rowheight=24, font=FONT_SMALL)
+                        fieldbackground=WHITE, rowheight=ROW_HEIGHT, font=FONT_SMALL)
         style.configure("Treeview.Heading", background=MAROON, foreground=WHITE,
                         font=FONT_BOLD,    relief="flat")
         style.map("Treeview",
@@ -243,6 +1327,7 @@ class App(tk.Tk):
         self._build_dataset_tab()
         self._build_analysis_tab()
         self._build_charts_tab()
+        self._build_diagnostics_tab()
 
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_change)
 
@@ -252,6 +1337,8 @@ class App(tk.Tk):
             self._run_analysis()
         elif tab == 3:
             self._render_chart()
+        elif self.notebook.select() == str(self.tab_diagnostics):
+            self._refresh_diagnostics()
 
     def _make_btn(self, parent, text, bg, fg, command):
         return tk.Button(parent, text=text, bg=bg, fg=fg,
@@ -260,6 +1347,55 @@ class App(tk.Tk):
                          activebackground=MAROON2, activeforeground=WHITE,
                          command=command)
 
+    def _debounce(self, key, func):
+        """Call func once the key has been quiet for FILTER_DEBOUNCE_MS."""
+        if key in self._after_ids:
+            self.after_cancel(self._after_ids.pop(key))
+
+        def fire():
+            del self._after_ids[key]
+            func()
+        self._after_ids[key] = self.after(FILTER_DEBOUNCE_MS, fire)
+
+    def _submit(self, key, work, done):
+        """Run work(is_stale) on a thread and pass its result to done() on the Tk thread.
+
+        Submitting again under the same key makes the older job stale: it
+        can stop early by checking is_stale(), and its result is dropped.
+        """
+        gen = self._job_gen.get(key, 0) + 1
+        self._job_gen[key] = gen
+
+        def is_stale():
+            return self._job_gen[key] != gen
+
+        def run():
+            try:
+                self._job_results.put((key, gen, work(is_stale), None, done))
+            except Exception as err:
+                self._job_results.put((key, gen, None, err, done))
+
+        if not self._jobs_running:
+            self.after(CHART_POLL_MS, self._poll_jobs)
+        self._jobs_running += 1
+        threading.Thread(target=run, daemon=True).start()
+
+    def _poll_jobs(self):
+        while True:
+            try:
+                key, gen, result, err, done = self._job_results.get_nowait()
+            except queue.Empty:
+                break
+            self._jobs_running -= 1
+            if gen != self._job_gen[key]:
+                continue
+            if err is not None:
+                self.report_callback_exception(type(err), err, err.__traceback__)
+            else:
+                done(result)
+        if self._jobs_running:
+            self.after(CHART_POLL_MS, self._poll_jobs)
+
 
     # ==================================================
     # TAB 1 - My Records
@@ -321,9 +1457,14 @@ class App(tk.Tk):
                        self._refresh_records_table).grid(
             row=len(fields)+6, column=0, columnspan=2, padx=12, pady=(6, 0), sticky="ew")
 
+        io_btns = tk.Frame(left, bg=WHITE)
+        io_btns.grid(row=len(fields)+7, column=0, columnspan=2, padx=12, pady=(6, 0), sticky="ew")
+        self._make_btn(io_btns, "Import CSV", GRAY, BLACK, self._import_records).pack(side="left", fill="x", expand=True, padx=(0, 2))
+        self._make_btn(io_btns, "Export CSV", GRAY, BLACK, self._export_records).pack(side="left", fill="x", expand=True)
+
         self.status_label = tk.Label(left, text="", bg=WHITE, fg="green",
                                      font=FONT_SMALL, wraplength=230, justify="left")
-        self.status_label.grid(row=len(fields)+7, column=0, columnspan=2,
+        self.status_label.grid(row=len(fields)+8, column=0, columnspan=2,
                                padx=12, pady=6, sticky="w")
 
         right = tk.Frame(self.tab_records, bg=WHITE, bd=1, relief="solid")
@@ -331,7 +1472,8 @@ class App(tk.Tk):
 
         hdr = tk.Frame(right, bg=MAROON)
         hdr.pack(fill="x")
-        tk.Label(hdr, text="  My Records  (custom_records.csv)",
+        source = RECORDS_DB if RECORDS_BACKEND == "sqlite" else RECORDS_FILE
+        tk.Label(hdr, text=f"  My Records  ({os.path.basename(source)})",
                  bg=MAROON, fg=WHITE, font=FONT_BOLD).pack(side="left", pady=6)
 
         cols = JobRecord.FIELDS
@@ -352,8 +1494,19 @@ class App(tk.Tk):
         self.records_tree.tag_configure("even", background=WHITE)
 
         self._refresh_records_table()
+        self.after(RECORDS_POLL_MS, self._watch_records)
+
+    def _watch_records(self):
+        # Another app instance may have changed the shared records file;
+        # search results are left alone until the user asks again.
+        if self.repo.is_stale():
+            self._sync_analysis()
+            if self._records_show_all:
+                self._refresh_records_table()
+        self.after(RECORDS_POLL_MS, self._watch_records)
 
     def _refresh_records_table(self):
+        self._records_show_all = True
         self.records_tree.delete(*self.records_tree.get_children())
         for i, r in enumerate(self.manager.get_all_records()):
             tag = "odd" if i % 2 else "even"
@@ -378,6 +1531,7 @@ class App(tk.Tk):
             v["year"], v["risk"], v["ai_score"], v["salary"], v["notes"])
         self._set_status(msg, ok)
         if ok:
+            self._fold_record(self.repo.get_record(v["rid"]))
             self._clear_form()
             self._refresh_records_table()
 
@@ -390,6 +1544,7 @@ class App(tk.Tk):
             ok, msg = self.manager.delete_record(rid)
             self._set_status(msg, ok)
             if ok:
+                self._unfold_record(rid)
                 self._refresh_records_table()
 
     def _clear_form(self):
@@ -400,6 +1555,7 @@ class App(tk.Tk):
     def _search_by_id(self):
         q = self.search_var.get().strip()
         result = self.manager.search_by_id(q)
+        self._records_show_all = False
         self.records_tree.delete(*self.records_tree.get_children())
         if result:
             self.records_tree.insert("", "end", values=[
@@ -413,6 +1569,7 @@ class App(tk.Tk):
     def _search_by_name(self):
         q = self.search_var.get().strip()
         results = self.manager.search_by_name(q)
+        self._records_show_all = False
         self.records_tree.delete(*self.records_tree.get_children())
         for i, r in enumerate(results):
             tag = "odd" if i % 2 else "even"
@@ -422,6 +1579,38 @@ class App(tk.Tk):
                 r.notes, r.date_added], tags=(tag,))
         self._set_status(f"{len(results)} result(s) found for '{q}'.", ok=bool(results))
 
+    def _import_records(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")])
+        if not path:
+            return
+        try:
+            added, rejects = self.manager.import_csv(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as err:
+            self._set_status(f"Could not import: {err}", ok=False)
+            return
+        self._sync_analysis()
+        self._refresh_records_table()
+        self._set_status(f"Imported {added:,} record(s), {len(rejects):,} rejected.", ok=not rejects)
+        if rejects:
+            lines = [f"Line {n}: {reason}" for n, reason in rejects[:IMPORT_REJECTS_SHOWN]]
+            if len(rejects) > IMPORT_REJECTS_SHOWN:
+                lines.append(f"... and {len(rejects) - IMPORT_REJECTS_SHOWN:,} more")
+            messagebox.showwarning("Rejected Rows", "\n".join(lines))
+
+    def _export_records(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")])
+        if not path:
+            return
+        try:
+            count = self.manager.export_csv(path)
+        except OSError as err:
+            self._set_status(f"Could not export: {err}", ok=False)
+            return
+        self._set_status(f"Exported {count:,} record(s).")
+
 
     # ==================================================
     # TAB 2 - View Dataset
@@ -434,20 +1623,24 @@ class App(tk.Tk):
         tk.Label(filter_bar, text="  Filter by Industry:",
                  bg=MAROON, fg=WHITE, font=FONT_SMALL).pack(side="left", padx=(10, 2), pady=8)
 
-        industries = ["All"] + (sorted(self.df["industry"].unique().tolist()) if not self.df.empty else [])
+        industries = ["All"] + (filter_values(self.df)[1] if not self.df.empty else [])
         self.ds_industry_var = tk.StringVar(value="All")
-        ttk.Combobox(filter_bar, textvariable=self.ds_industry_var,
-                     values=industries, width=14, state="readonly",
-                     font=FONT_SMALL).pack(side="left", padx=4, pady=6)
+        combo = ttk.Combobox(filter_bar, textvariable=self.ds_industry_var,
+                             values=industries, width=14, state="readonly",
+                             font=FONT_SMALL)
+        combo.pack(side="left", padx=4, pady=6)
+        combo.bind("<<ComboboxSelected>>", lambda e: self._debounce("dataset", self._filter_dataset))
 
         tk.Label(filter_bar, text="Year:",
                  bg=MAROON, fg=WHITE, font=FONT_SMALL).pack(side="left", padx=(10, 2))
 
-        years = ["All"] + (sorted(self.df["year"].unique().tolist()) if not self.df.empty else [])
+        years = ["All"] + (filter_values(self.df)[0] if not self.df.empty else [])
         self.ds_year_var = tk.StringVar(value="All")
-        ttk.Combobox(filter_bar, textvariable=self.ds_year_var,
-                     values=years, width=8, state="readonly",
-                     font=FONT_SMALL).pack(side="left", padx=4, pady=6)
+        combo = ttk.Combobox(filter_bar, textvariable=self.ds_year_var,
+                             values=years, width=8, state="readonly",
+                             font=FONT_SMALL)
+        combo.pack(side="left", padx=4, pady=6)
+        combo.bind("<<ComboboxSelected>>", lambda e: self._debounce("dataset", self._filter_dataset))
 
         self._make_btn(filter_bar, "Apply Filter", YELLOW, BLACK,
                        self._filter_dataset).pack(side="left", padx=10)
@@ -470,32 +1663,117 @@ class App(tk.Tk):
             self.ds_tree.heading(col, text=col.replace("_", " ").title())
             self.ds_tree.column(col, width=110, minwidth=60)
 
-        vsb = ttk.Scrollbar(table_frame, orient="vertical",   command=self.ds_tree.yview)
+        # The vertical scrollbar is driven by our own row offset, not by
+        # the Treeview, because the tree only ever holds one window of rows.
+        self.ds_vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self._ds_yview)
         hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self.ds_tree.xview)
-        self.ds_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.ds_tree.configure(xscrollcommand=hsb.set)
         self.ds_tree.pack(side="left", fill="both", expand=True)
-        vsb.pack(side="right", fill="y")
+        self.ds_vsb.pack(side="right", fill="y")
         hsb.pack(side="bottom", fill="x")
 
         self.ds_tree.tag_configure("odd",  background="#FFF0F0")
         self.ds_tree.tag_configure("even", background=WHITE)
 
-        self._load_dataset_table(self.df)
+        self.ds_tree.bind("<Configure>",  lambda e: self._ds_render())
+        self.ds_tree.bind("<MouseWheel>", self._ds_on_wheel)
+        self.ds_tree.bind("<Button-4>",   self._ds_on_wheel)
+        self.ds_tree.bind("<Button-5>",   self._ds_on_wheel)
+
+        self._ds_arrays = {col: self.df[col].to_numpy() for col in cols}
+        self._ds_index  = np.arange(len(self.df))
+        self._ds_offset = 0
+        self._load_dataset_table(self._ds_index)
+
+        # One boolean mask per filter value, so a filter is just an AND.
+        years, industries = filter_values(self.df)
+        self._ds_masks = {
+            col: {str(value): (self.df[col] == value).to_numpy() for value in values}
+            for col, values in (("industry", industries), ("year", years))
+        }
+
+    def _load_dataset_table(self, index):
+        """Show the dataset rows at the given positions (a numpy index array)."""
+        with TIMINGS.measure("App._load_dataset_table", len(index)):
+            self._ds_index  = index
+            self._ds_offset = 0
+            self._ds_render()
+            self.ds_count_label.config(text=f"Showing {len(index):,} records  ")
+
+    def _ds_visible_rows(self):
+        # One row's worth of height goes to the headings.
+        return max(1, self.ds_tree.winfo_height() // ROW_HEIGHT - 1)
+
+    def _ds_render(self):
+        total   = len(self._ds_index)
+        visible = self._ds_visible_rows()
+        self._ds_offset = max(0, min(self._ds_offset, total - visible))
+        start = self._ds_offset
+
+        rows    = self._ds_index[start:start + visible + DS_BUFFER_ROWS]
+        columns = []
+        for arr in self._ds_arrays.values():
+            window = arr[rows]
+            # str() keeps float32 short (30.94, not 30.940000534057617)
+            if window.dtype == np.float32:
+                columns.append(window.astype(str).tolist())
+            else:
+                columns.append(window.tolist())
+
+        # Reuse the existing items and only add/remove the difference.
+        items = self.ds_tree.get_children()
+        for n, values in enumerate(zip(*columns)):
+            tag = "odd" if (start + n) % 2 else "even"
+            if n < len(items):
+                self.ds_tree.item(items[n], values=values, tags=(tag,))
+            else:
+                self.ds_tree.insert("", "end", values=values, tags=(tag,))
+        if len(items) > len(rows):
+            self.ds_tree.delete(*items[len(rows):])
 
-    def _load_dataset_table(self, df):
-        self.ds_tree.delete(*self.ds_tree.get_children())
-        for i, (_, row) in enumerate(df.iterrows()):
-            tag = "odd" if i % 2 else "even"
-            self.ds_tree.insert("", "end", values=list(row), tags=(tag,))
-        self.ds_count_label.config(text=f"Showing {len(df):,} records  ")
+        if total:
+            self.ds_vsb.set(start / total, min(1.0, (start + visible) / total))
+        else:
+            self.ds_vsb.set(0.0, 1.0)
+
+    def _ds_yview(self, *args):
+        if args[0] == "moveto":
+            self._ds_offset = int(float(args[1]) * len(self._ds_index))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._ds_visible_rows()
+            self._ds_offset += step
+        self._ds_render()
+
+    def _ds_on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._ds_offset -= 3
+        else:
+            self._ds_offset += 3
+        self._ds_render()
+        return "break"
 
     def _filter_dataset(self):
-        df = self.df.copy()
-        if self.ds_industry_var.get() != "All":
-            df = df[df["industry"] == self.ds_industry_var.get()]
-        if self.ds_year_var.get() != "All":
-            df = df[df["year"] == int(self.ds_year_var.get())]
-        self._load_dataset_table(df)
+        if self.df.empty:
+            return
+        selected = [self._ds_masks[col][var.get()]
+                    for col, var in (("industry", self.ds_industry_var), ("year", self.ds_year_var))
+                    if var.get() != "All"]
+        self.ds_count_label.config(text="Filtering...  ")
+        self._submit("dataset", lambda is_stale: self._filter_index(selected, is_stale),
+                     self._load_dataset_table)
+
+    def _filter_index(self, masks, is_stale):
+        # Runs off the Tk thread; gives up as soon as a newer filter arrives.
+        if not masks:
+            return np.arange(len(self.df))
+        mask = masks[0].copy()
+        for other in masks[1:]:
+            if is_stale():
+                return None
+            mask &= other
+        return np.flatnonzero(mask)
 
 
     # ==================================================
@@ -509,20 +1787,24 @@ class App(tk.Tk):
         tk.Label(ctrl, text="  Data Analysis  |  Year:",
                  bg=MAROON, fg=WHITE, font=FONT_BOLD).pack(side="left", pady=8, padx=4)
 
-        years = ["All"] + (sorted(self.df["year"].unique().tolist()) if not self.df.empty else [])
+        years = ["All"] + (filter_values(self.df)[0] if not self.df.empty else [])
         self.an_year_var = tk.StringVar(value="All")
-        ttk.Combobox(ctrl, textvariable=self.an_year_var,
-                     values=years, width=8, state="readonly",
-                     font=FONT_SMALL).pack(side="left", padx=4, pady=6)
+        combo = ttk.Combobox(ctrl, textvariable=self.an_year_var,
+                             values=years, width=8, state="readonly",
+                             font=FONT_SMALL)
+        combo.pack(side="left", padx=4, pady=6)
+        combo.bind("<<ComboboxSelected>>", lambda e: self._debounce("analysis", self._run_analysis))
 
         tk.Label(ctrl, text="Industry:",
                  bg=MAROON, fg=WHITE, font=FONT_SMALL).pack(side="left", padx=(10, 2))
 
-        industries = ["All"] + (sorted(self.df["industry"].unique().tolist()) if not self.df.empty else [])
+        industries = ["All"] + (filter_values(self.df)[1] if not self.df.empty else [])
         self.an_industry_var = tk.StringVar(value="All")
-        ttk.Combobox(ctrl, textvariable=self.an_industry_var,
-                     values=industries, width=14, state="readonly",
-                     font=FONT_SMALL).pack(side="left", padx=4, pady=6)
+        combo = ttk.Combobox(ctrl, textvariable=self.an_industry_var,
+                             values=industries, width=14, state="readonly",
+                             font=FONT_SMALL)
+        combo.pack(side="left", padx=4, pady=6)
+        combo.bind("<<ComboboxSelected>>", lambda e: self._debounce("analysis", self._run_analysis))
 
         self._make_btn(ctrl, "Run Analysis", YELLOW, BLACK,
                        self._run_analysis).pack(side="left", padx=10)
@@ -552,19 +1834,86 @@ class App(tk.Tk):
             self._run_analysis()
 
     def _run_analysis(self):
+        if self.cube is None:
+            self._show_analysis(None, "All", "All")
+            return
+
+        year     = self.an_year_var.get()
+        industry = self.an_industry_var.get()
+        self._submit("analysis",
+                     lambda is_stale: self._analyze(None if year == "All" else int(year),
+                                                    None if industry == "All" else industry),
+                     lambda result: self._show_analysis(result, year, industry))
+
+    def _analyze(self, year, industry):
+        # Runs on a worker thread.
+        with TIMINGS.measure("App._run_analysis") as entry, self._analysis_lock:
+            result = analyze(self.analysis_cube, year=year, industry=industry)
+            entry.rows = result["records"]
+        return result
+
+    def _fold_record(self, record):
+        """Count one of My Records in the analysis, replacing its old values."""
+        self._unfold_record(record.rid)
+        row = record.analysis_row()
+        if self.analysis_cube is None or row is None:
+            return
+        with self._analysis_lock:
+            self.analysis_cube.add_row(row)
+        self._analysis_rows[record.rid] = (record.to_row(), row)
+        self._analysis_changed()
+
+    def _unfold_record(self, rid):
+        if rid not in self._analysis_rows:
+            return
+        _, row = self._analysis_rows.pop(rid)
+        with self._analysis_lock:
+            self.analysis_cube.remove_row(row)
+        self._analysis_changed()
+
+    def _sync_analysis(self):
+        """Fold in only the records that were added, changed or deleted
+        (by an import or another app instance) since the last sync."""
+        if self.analysis_cube is None:
+            return
+        current = {r.rid: r for r in self.manager.get_all_records()}
+        for rid in [rid for rid in self._analysis_rows if rid not in current]:
+            self._unfold_record(rid)
+        changed = [record for rid, record in current.items()
+                   if rid not in self._analysis_rows or self._analysis_rows[rid][0] != record.to_row()]
+        if len(changed) < ANALYSIS_BATCH_MIN:
+            for record in changed:
+                self._fold_record(record)
+            return
+
+        # Old values still go out one at a time; usually there are none.
+        for record in changed:
+            self._unfold_record(record.rid)
+        folded = {}
+        for record in changed:
+            row = record.analysis_row()
+            if row is not None:
+                folded[record.rid] = (record.to_row(), row)
+        with self._analysis_lock:
+            self.analysis_cube.add_rows(row for _, row in folded.values())
+        self._analysis_rows.update(folded)
+        self._analysis_changed()
+
+    def _analysis_changed(self):
+        if hasattr(self, "notebook") and self.notebook.index(self.notebook.select()) == 2:
+            self._debounce("analysis", self._run_analysis)
+
+    @instrumented()
+    def _show_analysis(self, result, year, industry):
         self.analysis_text.config(state="normal")
         self.analysis_text.delete("1.0", "end")
 
-        df = self.df.copy()
-        if df.empty:
+        if result is None:
             self.analysis_text.insert("end", "\nNo dataset loaded.\n", "bad")
             self.analysis_text.config(state="disabled")
             return
 
-        if self.an_year_var.get() != "All":
-            df = df[df["year"] == int(self.an_year_var.get())]
-        if self.an_industry_var.get() != "All":
-            df = df[df["industry"] == self.an_industry_var.get()]
+        n_rows = result["records"]
 
         def write(text, tag=""):
             self.analysis_text.insert("end", text, tag)
@@ -572,13 +1921,13 @@ class App(tk.Tk):
         sep = "-" * 65
 
         write("\n  AI Job Displacement - Data Analysis Report\n", "title")
-        write(f"  Year = {self.an_year_var.get()}  |  Industry = {self.an_industry_var.get()}\n", "gray")
-        write(f"  Records in filter: {len(df):,}\n\n", "gray")
+        write(f"  Year = {year}  |  Industry = {industry}\n", "gray")
+        write(f"  Records in filter: {n_rows:,}\n\n", "gray")
 
         # Q1
         write("  Q1: What is the average automation risk per industry?\n", "section")
         write(f"  {sep}\n", "gray")
-        q1 = df.groupby("industry")["automation_risk_percent"].mean().sort_values(ascending=False).round(2)
+        q1 = result["q1"]
         write(f"  {'Industry':<22} {'Avg Risk %':>10}\n")
         for ind, val in q1.items():
             tag = "bad" if val > 55 else ("good" if val < 35 else "")
@@ -587,7 +1936,7 @@ class App(tk.Tk):
         # Q2
         write(f"\n  Q2: Which countries have the highest average AI replacement score?\n", "section")
         write(f"  {sep}\n", "gray")
-        q2 = df.groupby("country")["ai_replacement_score"].mean().sort_values(ascending=False).round(2)
+        q2 = result["q2"]
         write(f"  {'Country':<18} {'Avg AI Score':>14}\n")
         for country, val in q2.items():
             write(f"  {country:<18} {val:>14.2f}\n")
@@ -595,7 +1944,7 @@ class App(tk.Tk):
         # Q3
         write(f"\n  Q3: How does automation risk category affect average salary change?\n", "section")
         write(f"  {sep}\n", "gray")
-        q3 = df.groupby("automation_risk_category")["salary_change_percent"].mean().round(2)
+        q3 = result["q3"]
         write(f"  {'Risk Category':<18} {'Avg Salary Change %':>20}\n")
         for cat, val in q3.items():
             tag = "bad" if val < 0 else "good"
@@ -604,7 +1953,7 @@ class App(tk.Tk):
         # Q4
         write(f"\n  Q4: How have AI adoption levels changed year by year?\n", "section")
         write(f"  {sep}\n", "gray")
-        q4 = df.groupby("year")[["ai_adoption_level", "reskilling_urgency_score"]].mean().round(2)
+        q4 = result["q4"]
         write(f"  {'Year':<8} {'AI Adoption Avg':>16} {'Reskilling Urgency Avg':>24}\n")
         for yr, row in q4.iterrows():
             write(f"  {int(yr):<8} {row['ai_adoption_level']:>16.2f} {row['reskilling_urgency_score']:>24.2f}\n")
@@ -612,7 +1961,7 @@ class App(tk.Tk):
         # Q5
         write(f"\n  Q5: What are the top 10 job roles with the highest salary before AI?\n", "section")
         write(f"  {sep}\n", "gray")
-        q5 = df.groupby("job_role")["salary_before_usd"].mean().sort_values(ascending=False).head(10).round(2)
+        q5 = result["q5"]
         write(f"  {'Job Role':<28} {'Avg Salary Before (USD)':>24}\n")
         for role, val in q5.items():
             write(f"  {role:<28} ${val:>23,.2f}\n")
@@ -620,13 +1969,11 @@ class App(tk.Tk):
         # Bonus
         write(f"\n  Bonus: Correlation - Skill Gap Index, Wage Volatility, AI Disruption\n", "section")
         write(f"  {sep}\n", "gray")
-        cols_corr = ["skill_gap_index", "wage_volatility_index", "ai_disruption_intensity"]
-        if all(c in df.columns for c in cols_corr):
-            corr = df[cols_corr].corr().round(3)
-            write(f"\n{corr.to_string()}\n")
+        if result["corr"] is not None:
+            write(f"\n{result['corr'].to_string()}\n")
 
         write(f"\n  {sep}\n", "gray")
-        write(f"  Done. {len(df):,} records analyzed.\n\n", "good")
+        write(f"  Done. {n_rows:,} records analyzed.\n\n", "good")
         self.analysis_text.config(state="disabled")
 
 
@@ -671,6 +2018,12 @@ class App(tk.Tk):
         self.chart_area = tk.Frame(self.tab_charts, bg=WHITE)
         self.chart_area.pack(fill="both", expand=True)
 
+        self.chart_msg = tk.Label(self.chart_area, text="", bg=WHITE, fg=DGRAY, font=FONT)
+
+        # (chart name, dataset version) -> (figure, canvas), least recent first
+        self._chart_cache   = OrderedDict()
+        self._chart_pending = set()
+
     def _select_chart(self, option):
         self.chart_var.set(option)
         for opt, btn in self._chart_buttons.items():
@@ -683,37 +2036,66 @@ class App(tk.Tk):
     def _render_chart(self):
         if self.df.empty:
             return
-        df = self.df
-        choice = self.chart_var.get()
-
-        plt.rcParams.update({
-            "figure.facecolor": WHITE,
-            "axes.facecolor":   "#FFF8F8",
-            "axes.edgecolor":   GRAY,
-            "text.color":       BLACK,
-            "axes.labelcolor":  DGRAY,
-            "xtick.color":      DGRAY,
-            "ytick.color":      DGRAY,
-            "axes.titlecolor":  MAROON,
-            "grid.color":       GRAY,
-            "font.family":      "sans-serif",
-        })
-
-        fig = plt.Figure(figsize=(10, 6), tight_layout=True)
-
-        if   choice == "Overview":              self._chart_overview(fig, df)
-        elif choice == "Risk by Industry":      self._chart_risk(fig, df)
-        elif choice == "Salary Before vs After": self._chart_salary(fig, df)
-        elif choice == "Trend Over Years":      self._chart_trend(fig, df)
-        elif choice == "Top Job Roles":         self._chart_jobs(fig, df)
-
-        for widget in self.chart_area.winfo_children():
-            widget.destroy()
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_area)
-        canvas.draw()
+        key = (self.chart_var.get(), self.dataset_version)
+        if key in self._chart_cache:
+            self._chart_cache.move_to_end(key)
+            self._show_chart(key)
+            return
+
+        self._show_chart_message("Rendering chart...")
+        if key in self._chart_pending:
+            return
+        self._chart_pending.add(key)
+        df, cube = self.df, self.cube
+        self._submit(("chart",) + key,
+                     lambda is_stale: self._chart_data(key, df, cube),
+                     lambda result: self._chart_done(key, *result))
+
+    def _chart_data(self, key, df, cube):
+        # Runs on a worker thread: only the pandas work happens here.
+        # Errors are returned so _chart_done can show them in the tab.
+        try:
+            with TIMINGS.measure(f"App._render_chart: {key[0]} (data)", len(df)):
+                return CHARTS[key[0]][0](df, cube), None
+        except Exception as err:
+            return None, err
+
+    def _chart_done(self, key, data, err):
+        self._chart_pending.discard(key)
+        current = key == (self.chart_var.get(), self.dataset_version)
+        if err is not None:
+            if current:
+                self._show_chart_message(f"Could not build chart: {err}")
+            return
+        self._draw_chart(key, data)
+        if current:
+            self._show_chart(key)
+
+    def _draw_chart(self, key, data):
+        with TIMINGS.measure(f"App._render_chart: {key[0]} (draw)", len(self.df)):
+            fig = draw_chart(key[0], data)
+            canvas = FigureCanvasTkAgg(fig, master=self.chart_area)
+            canvas.draw()
+        self._chart_cache[key] = (fig, canvas)
+        while len(self._chart_cache) > CHART_CACHE_SIZE:
+            _, (_, old_canvas) = self._chart_cache.popitem(last=False)
+            old_canvas.get_tk_widget().destroy()
+
+    def _show_chart(self, key):
+        fig, canvas = self._chart_cache[key]
+        self.chart_msg.pack_forget()
+        for _, other in self._chart_cache.values():
+            if other is not canvas:
+                other.get_tk_widget().pack_forget()
         canvas.get_tk_widget().pack(fill="both", expand=True)
         self._current_fig = fig
 
+    def _show_chart_message(self, text):
+        for _, canvas in self._chart_cache.values():
+            canvas.get_tk_widget().pack_forget()
+        self.chart_msg.config(text=text)
+        self.chart_msg.pack(expand=True)
+
     def _save_chart(self):
         if not hasattr(self, "_current_fig"):
             messagebox.showinfo("No Chart", "Go to the Charts tab first to generate a chart.")
@@ -725,134 +2107,83 @@ class App(tk.Tk):
             self._current_fig.savefig(path, dpi=150, bbox_inches="tight")
             messagebox.showinfo("Saved", f"Chart saved:\n{path}")
 
-    def _chart_overview(self, fig, df):
-        axes = fig.subplots(2, 2)
-        fig.suptitle("Overview Dashboard", color=MAROON, fontsize=13, fontweight="bold")
-
-        ax = axes[0, 0]
-        rc = df["automation_risk_category"].value_counts()
-        ax.pie(rc.values, labels=rc.index, autopct="%1.1f%%",
-               colors=[MAROON, YELLOW, "#CCCCCC"], startangle=120,
-               wedgeprops=dict(edgecolor=WHITE, linewidth=2))
-        ax.set_title("Automation Risk Categories")
-
-        ax = axes[0, 1]
-        by_ind = df.groupby("industry")["ai_replacement_score"].mean().sort_values()
-        ax.barh(by_ind.index, by_ind.values, color=MAROON, edgecolor=WHITE)
-        ax.set_title("Avg AI Replacement Score by Industry")
-        ax.set_xlabel("Score")
-
-        ax = axes[1, 0]
-        trend = df.groupby("year")[["ai_adoption_level", "reskilling_urgency_score"]].mean()
-        ax.plot(trend.index, trend["ai_adoption_level"], marker="o",
-                color=MAROON, label="AI Adoption", linewidth=2)
-        ax.plot(trend.index, trend["reskilling_urgency_score"], marker="s",
-                color=YELLOW, label="Reskilling Urgency", linewidth=2)
-        ax.set_title("AI Adoption vs Reskilling Urgency")
-        ax.legend(fontsize=8)
-        ax.grid(True, alpha=0.3)
-
-        ax = axes[1, 1]
-        ax.scatter(df["automation_risk_percent"], df["salary_change_percent"],
-                   alpha=0.3, s=10, color=MAROON)
-        ax.axhline(0, color="red", linestyle="--", linewidth=1)
-        ax.set_title("Automation Risk vs Salary Change %")
-        ax.set_xlabel("Automation Risk %")
-        ax.set_ylabel("Salary Change %")
-
-    def _chart_risk(self, fig, df):
-        ax = fig.add_subplot(111)
-        fig.suptitle("Automation Risk % by Industry (Box Plot)",
-                     color=MAROON, fontsize=13, fontweight="bold")
-        industries = sorted(df["industry"].unique())
-        data = [df[df["industry"] == ind]["automation_risk_percent"].dropna().values
-                for ind in industries]
-        bp = ax.boxplot(data, labels=industries, patch_artist=True,
-                        medianprops=dict(color=YELLOW, linewidth=2))
-        for patch in bp["boxes"]:
-            patch.set_facecolor(MAROON)
-            patch.set_alpha(0.6)
-        ax.set_ylabel("Automation Risk %")
-        ax.grid(True, axis="y", alpha=0.3)
-        plt.setp(ax.get_xticklabels(), rotation=20, ha="right", fontsize=9)
-
-    def _chart_salary(self, fig, df):
-        axes = fig.subplots(1, 2)
-        fig.suptitle("Salary Impact of AI Automation",
-                     color=MAROON, fontsize=13, fontweight="bold")
-
-        ax = axes[0]
-        grp = df.groupby("country")[["salary_before_usd", "salary_after_usd"]].mean().sort_values("salary_before_usd")
-        x = range(len(grp))
-        w = 0.38
-        ax.bar([i - w/2 for i in x], grp["salary_before_usd"] / 1000, w,
-               label="Before", color=MAROON, alpha=0.85)
-        ax.bar([i + w/2 for i in x], grp["salary_after_usd"] / 1000, w,
-               label="After",  color=YELLOW, alpha=0.85)
-        ax.set_xticks(list(x))
-        ax.set_xticklabels(grp.index, rotation=30, ha="right", fontsize=8)
-        ax.set_ylabel("Avg Salary (USD '000)")
-        ax.set_title("Salary Before vs After by Country")
-        ax.legend(fontsize=8)
-        ax.grid(True, axis="y", alpha=0.3)
-
-        ax = axes[1]
-        change = df["salary_change_percent"].dropna()
-        ax.hist(change, bins=40, color=MAROON, edgecolor=WHITE, alpha=0.85)
-        ax.axvline(change.mean(), color=YELLOW, linestyle="--", linewidth=2,
-                   label=f"Mean: {change.mean():.1f}%")
-        ax.axvline(0, color="red", linestyle="--", linewidth=1, label="0% (no change)")
-        ax.set_title("Distribution of Salary Change %")
-        ax.set_xlabel("Salary Change %")
-        ax.set_ylabel("Count")
-        ax.legend(fontsize=8)
-        ax.grid(True, alpha=0.3)
-
-    def _chart_trend(self, fig, df):
-        ax = fig.add_subplot(111)
-        fig.suptitle("Key Metrics Trend Over Years (2020-2026)",
-                     color=MAROON, fontsize=13, fontweight="bold")
-        metrics = {
-            "ai_replacement_score":     (MAROON,    "AI Replacement Score"),
-            "reskilling_urgency_score":  (YELLOW,    "Reskilling Urgency"),
-            "skill_gap_index":           ("#888888", "Skill Gap Index"),
-            "wage_volatility_index":     ("#CC6600", "Wage Volatility"),
-        }
-        for col, (color, label) in metrics.items():
-            trend = df.groupby("year")[col].mean()
-            ax.plot(trend.index, trend.values, marker="o", color=color,
-                    label=label, linewidth=2, markersize=5)
-        ax.set_xlabel("Year")
-        ax.set_ylabel("Average Score")
-        ax.legend(fontsize=9)
-        ax.grid(True, alpha=0.3)
-        ax.set_xticks(sorted(df["year"].unique()))
-
-    def _chart_jobs(self, fig, df):
-        axes = fig.subplots(1, 2)
-        fig.suptitle("Top 10 Job Roles Comparison",
-                     color=MAROON, fontsize=13, fontweight="bold")
-
-        top_risk = df.groupby("job_role")["automation_risk_percent"].mean().sort_values(ascending=False).head(10)
-        ax = axes[0]
-        ax.barh(top_risk.index[::-1], top_risk.values[::-1],
-                color=MAROON, edgecolor=WHITE, alpha=0.85)
-        ax.set_title("Highest Automation Risk")
-        ax.set_xlabel("Avg Automation Risk %")
-        ax.grid(True, axis="x", alpha=0.3)
-
-        top_sal = df.groupby("job_role")["salary_before_usd"].mean().sort_values(ascending=False).head(10)
-        ax = axes[1]
-        ax.barh(top_sal.index[::-1], top_sal.values[::-1] / 1000,
-                color=YELLOW, edgecolor=WHITE, alpha=0.85)
-        ax.set_title("Highest Salary Before AI")
-        ax.set_xlabel("Avg Salary (USD '000)")
-        ax.grid(True, axis="x", alpha=0.3)
+    # ==================================================
+    # Diagnostics (hidden tab, Ctrl+Shift+D)
+    # ==================================================
+
+    def _build_diagnostics_tab(self):
+        self.tab_diagnostics = tk.Frame(self.notebook, bg=LGRAY)
+
+        ctrl = tk.Frame(self.tab_diagnostics, bg=MAROON)
+        ctrl.pack(fill="x")
+        tk.Label(ctrl, text=f"  Timed actions (last {PROFILE_HISTORY})",
+                 bg=MAROON, fg=WHITE, font=FONT_BOLD).pack(side="left", pady=8, padx=8)
+        self._make_btn(ctrl, "Clear", YELLOW, BLACK,
+                       self._clear_diagnostics).pack(side="right", padx=10)
+        self._make_btn(ctrl, "Refresh", YELLOW, BLACK,
+                       self._refresh_diagnostics).pack(side="right")
+
+        summary_cols = {"action": 300, "calls": 60, "total": 90, "mean": 90, "max": 90, "rows": 90}
+        self.diag_summary = ttk.Treeview(self.tab_diagnostics, columns=list(summary_cols),
+                                         show="headings", height=8)
+        for col, width in summary_cols.items():
+            label = col.title() + (" (ms)" if col in ("total", "mean", "max") else "")
+            self.diag_summary.heading(col, text=label)
+            self.diag_summary.column(col, width=width, anchor="w" if col == "action" else "e")
+        self.diag_summary.pack(fill="x", padx=10, pady=(10, 6))
+
+        recent_cols = {"time": 90, "action": 300, "ms": 90, "rows": 90}
+        self.diag_recent = ttk.Treeview(self.tab_diagnostics, columns=list(recent_cols),
+                                        show="headings")
+        for col, width in recent_cols.items():
+            self.diag_recent.heading(col, text=col.title() if col != "ms" else "Duration (ms)")
+            self.diag_recent.column(col, width=width, anchor="w" if col in ("time", "action") else "e")
+        self.diag_recent.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def _toggle_diagnostics(self, event=None):
+        if str(self.tab_diagnostics) in self.notebook.tabs():
+            self.notebook.forget(self.tab_diagnostics)
+        else:
+            self.notebook.add(self.tab_diagnostics, text="  Diagnostics  ")
+            self.notebook.select(self.tab_diagnostics)
+
+    def _refresh_diagnostics(self):
+        def rows(n):
+            return f"{n:,}" if n is not None else ""
+
+        self.diag_summary.delete(*self.diag_summary.get_children())
+        for action, calls, total, mean, worst, last_rows in TIMINGS.summary():
+            self.diag_summary.insert("", "end", values=(
+                action, calls, f"{total * 1000:.1f}", f"{mean * 1000:.1f}",
+                f"{worst * 1000:.1f}", rows(last_rows)))
+
+        self.diag_recent.delete(*self.diag_recent.get_children())
+        for e in reversed(TIMINGS.recent()):
+            self.diag_recent.insert("", "end", values=(
+                datetime.fromtimestamp(e.started).strftime("%H:%M:%S"),
+                e.action, f"{e.seconds * 1000:.1f}", rows(e.rows)))
+
+    def _clear_diagnostics(self):
+        TIMINGS.clear()
+        self._refresh_diagnostics()
+
 
 
 # ==================================================
 # Entry point
 # ==================================================
 if __name__ == "__main__":
-    app = App()
+    parser = argparse.ArgumentParser(description="AI Job Displacement - Record Management System")
+    parser.add_argument("--profile", action="store_true",
+                        help="show the Diagnostics tab and print the timings on exit")
+    parser.add_argument("--cprofile", metavar="DIR",
+                        help="also run each action under cProfile and write DIR/<action>.prof on exit")
+    args = parser.parse_args()
+
+    TIMINGS.profile = bool(args.cprofile)
+    app = App(diagnostics=args.profile or bool(args.cprofile))
     app.mainloop()
+    if args.profile or args.cprofile:
+        TIMINGS.report()
+    if args.cprofile:
+        TIMINGS.dump_profiles(args.cprofile)
@@ -0,0 +1,1123 @@
+"""
+Analysis engine for the AI Job Displacement dataset.
+
+Everything in here is plain pandas/matplotlib with no Tk, so the
+Records Management app and the command line share the same numbers and
+charts. The CLI can run on a server without a display, e.g. from cron:
+
+    python analysis.py report --year 2024 --industry Finance
+    python analysis.py report --all-filters --format csv -o reports.csv
+    python analysis.py report --chunksize 500000 --dataset big_export.csv
+    python analysis.py report --workers 16 --dataset big_export.csv
+    python analysis.py charts --all-filters --out-dir charts --workers 4
+"""
+import os
+import sys
+import csv
+import copy
+import json
+import heapq
+import hashlib
+import argparse
+import itertools
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib.artist import setp
+from matplotlib.colors import LinearSegmentedColormap, LogNorm
+from matplotlib.figure import Figure
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATASET_FILE = os.path.join(script_dir, "ai_job_replacement_2020_2026_v2.csv")
+
+
+# --------------------------------------------------
+# Colors (MSEUF theme) and chart style
+# --------------------------------------------------
+
+MAROON  = "#7B0D1E"
+MAROON2 = "#5C0A16"
+YELLOW  = "#F5C518"
+WHITE   = "#FFFFFF"
+LGRAY   = "#F5F5F5"
+GRAY    = "#DDDDDD"
+DGRAY   = "#555555"
+BLACK   = "#111111"
+
+CHART_RC = {
+    "figure.facecolor": WHITE,
+    "axes.facecolor":   "#FFF8F8",
+    "axes.edgecolor":   GRAY,
+    "text.color":       BLACK,
+    "axes.labelcolor":  DGRAY,
+    "xtick.color":      DGRAY,
+    "ytick.color":      DGRAY,
+    "axes.titlecolor":  MAROON,
+    "grid.color":       GRAY,
+    "font.family":      "sans-serif",
+}
+
+# Load schema for the dataset: labels as categoricals, score/index columns
+# as float32 and small integers as int16 (an integer column with a blank
+# stays float64, see apply_dataset_schema). Percent and salary columns keep
+# float64, and so does ai_replacement_score: Q2 prints its means to two
+# decimals and float32 moves a few of them across a rounding tie.
+DATASET_SCHEMA = {
+    "job_role":                    "category",
+    "industry":                    "category",
+    "country":                     "category",
+    "automation_risk_category":    "category",
+    "year":                        "int16",
+    "education_requirement_level": "int16",
+    "skill_gap_index":             "float32",
+    "remote_feasibility_score":    "float32",
+    "reskilling_urgency_score":    "float32",
+    "wage_volatility_index":       "float32",
+}
+
+# automation_risk_category is Low below 30% risk, Medium below 60%, else High.
+RISK_CATEGORIES = [(30.0, "Low"), (60.0, "Medium"), (float("inf"), "High")]
+
+# Level of detail: above LOD_POINTS rows the overview scatter is drawn as
+# an LOD_BINS x LOD_BINS density image instead of one marker per row, so
+# drawing costs the same at any size. Below about 150k rows drawing every
+# point is as fast (see "benchmarks.py render"). Histograms are always
+# binned in the *_data function and drawn from the counts.
+LOD_POINTS = 150000
+LOD_BINS   = 200
+HIST_BINS  = 40
+
+# Below this many rows build_cube stays in-process: starting the worker
+# pool and copying the columns to shared memory costs more than it saves.
+PARALLEL_MIN_ROWS = 2000000
+
+
+# ==================================================
+# PART I - Pre-aggregated group-by cube
+# ==================================================
+
+class AggregateCube:
+    """Sums and counts of the analysis columns, grouped once at load.
+
+    Each cell holds the totals for one (year, industry, country, job_role,
+    risk category) combination, so every Year/Industry filter is answered
+    by adding up matching cells instead of rescanning the raw rows.
+
+    Cells are mergeable partial aggregates: cubes built from separate
+    chunks of the dataset can be merged into the cube of the whole
+    (see from_csv). Means are kept as sum/count. For the correlation
+    matrix each cell keeps, per column pair, the count, the two means and
+    the co-moments about those means (Welford's accumulators), which are
+    pooled with Chan et al.'s parallel update instead of raw sums of
+    squares.
+
+    Single rows can also be added and removed in place (add_row and
+    remove_row, e.g. for My Records), updating one cell in O(1).
+    """
+
+    KEYS = ["year", "industry", "country", "job_role", "automation_risk_category"]
+    MEAN_COLS = ["automation_risk_percent", "ai_replacement_score",
+                 "salary_change_percent", "ai_adoption_level",
+                 "reskilling_urgency_score", "salary_before_usd"]
+    CORR_COLS = ["skill_gap_index", "wage_volatility_index", "ai_disruption_intensity"]
+
+    def __init__(self, df):
+        # Sums are always taken in float64, whatever the load schema.
+        parts = {"rows": np.ones(len(df), dtype="int64")}
+        for col in self.MEAN_COLS:
+            valid = df[col].notna()
+            parts[f"sum:{col}"] = df[col].astype("float64").where(valid, 0.0)
+            parts[f"n:{col}"]   = valid.astype("int64")
+
+        self.corr_cols = [c for c in self.CORR_COLS if c in df.columns]
+        self.pairs = [f"{a}:{b}" for a, b in
+                      itertools.combinations_with_replacement(self.corr_cols, 2)]
+
+        work = pd.DataFrame(parts, index=df.index)
+        for key in self.KEYS:
+            work[key] = df[key]
+        codes = work.groupby(self.KEYS, sort=False, observed=True).ngroup()
+        # A row with a missing key has no group (NaN, or -1 in older
+        # pandas); like groupby, leave those rows out.
+        keep = (codes.notna() & (codes >= 0)).to_numpy()
+        if not keep.all():
+            df, work, codes = df[keep], work[keep], codes[keep]
+            _integral_keys(work, self.KEYS)
+        codes = codes.to_numpy("int64")
+        n_cells = codes.max() + 1 if len(codes) else 0
+
+        # Co-moments about each cell's own means. Like DataFrame.corr(),
+        # each pair only uses rows where both values are present.
+        means = {}
+        for pair in self.pairs:
+            a, b = pair.split(":")
+            valid = (df[a].notna() & df[b].notna()).to_numpy()
+            x = np.where(valid, df[a].to_numpy("float64", na_value=np.nan), 0.0)
+            y = np.where(valid, df[b].to_numpy("float64", na_value=np.nan), 0.0)
+            n = np.bincount(codes, weights=valid, minlength=n_cells)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mx = np.nan_to_num(np.bincount(codes, weights=x, minlength=n_cells) / n)
+                my = np.nan_to_num(np.bincount(codes, weights=y, minlength=n_cells) / n)
+            dx = np.where(valid, x - mx[codes], 0.0)
+            dy = np.where(valid, y - my[codes], 0.0)
+            work[f"n:{pair}"]   = valid.astype("int64")
+            work[f"cxx:{pair}"] = dx * dx
+            work[f"cyy:{pair}"] = dy * dy
+            work[f"cxy:{pair}"] = dx * dy
+            means[f"mx:{pair}"] = mx
+            means[f"my:{pair}"] = my
+
+        self.cells = (work.groupby(self.KEYS, sort=False, observed=True)
+                          .sum()
+                          .reset_index())
+        for col, values in means.items():
+            self.cells[col] = values
+        self._positions = None    # cell key -> row of cells, built on first add_row
+        self._emptied   = False   # some cell lost all its rows to remove_row
+
+    @classmethod
+    def from_csv(cls, path, chunksize=200000, prepare=None):
+        """Build the cube from a CSV too big to load, chunksize rows at a time.
+
+        Only one chunk and the (bounded) cells are in memory at once.
+        prepare, e.g. apply_dataset_schema, runs on each chunk.
+        """
+        cube = None
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk.columns = chunk.columns.str.strip()
+            if prepare is not None:
+                chunk = prepare(chunk)
+            part = cls(chunk)
+            cube = part if cube is None else cube.merge(part)
+        return cube
+
+    @classmethod
+    def parallel(cls, df, workers=None):
+        """Build the cube in worker processes, one row range per worker.
+
+        The columns are copied once into shared memory and each worker
+        builds the cube of its rows from views of those buffers, so only
+        the (small) cells are pickled back to be merged. Label columns
+        travel as integer codes and get their labels back after the merge.
+        """
+        workers = workers or os.cpu_count() or 1
+        # Workers see missing labels as code -1, so drop those rows here
+        # (AggregateCube leaves them out too).
+        missing = df[cls.KEYS].isna().any(axis=1).to_numpy()
+        if missing.any():
+            df = df[~missing].copy()
+            _integral_keys(df, cls.KEYS)
+        bounds = np.linspace(0, len(df), workers + 1).astype(int)
+        ranges = [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+        if not ranges:
+            return cls(df)
+
+        columns, labels = {}, {}
+        for key in cls.KEYS:
+            if isinstance(df[key].dtype, pd.CategoricalDtype):
+                columns[key], labels[key] = df[key].cat.codes.to_numpy(), df[key].dtype
+            elif pd.api.types.is_numeric_dtype(df[key]):
+                columns[key] = df[key].to_numpy()
+            else:
+                columns[key], labels[key] = pd.factorize(df[key])
+        for col in cls.MEAN_COLS + cls.CORR_COLS:
+            if col in df.columns:
+                columns[col] = _as_numpy(df[col])
+
+        blocks, spec = [], []
+        try:
+            for name, values in columns.items():
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(values.shape, values.dtype, buffer=block.buf)[:] = values
+                spec.append((name, block.name, values.dtype.str))
+            with ProcessPoolExecutor(max_workers=len(ranges), initializer=_attach_columns,
+                                     initargs=(spec, len(df))) as pool:
+                parts = list(pool.map(_cube_of_rows, *zip(*ranges)))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        cube = parts[0].merge(*parts[1:])
+        for key, dtype in labels.items():
+            codes = cube.cells[key].to_numpy()
+            if isinstance(dtype, pd.CategoricalDtype):
+                cube.cells[key] = pd.Categorical.from_codes(codes, dtype=dtype)
+            else:
+                cube.cells[key] = dtype.take(codes)
+        return cube
+
+    def merge(self, *others):
+        """Fold other cubes (e.g. of the next chunks) into this one.
+
+        Cells keep the order they first appear in, so merging the cubes of
+        consecutive row ranges gives the same cells as one cube of all rows.
+        """
+        if any(other.corr_cols != self.corr_cols for other in others):
+            raise ValueError("can't merge cubes with different correlation columns")
+        cells = pd.concat([self.cells] + [other.cells for other in others], ignore_index=True)
+        codes = cells.groupby(self.KEYS, sort=False, observed=True).ngroup().to_numpy()
+
+        # Means go back to sums so they add up like everything else.
+        for pair in self.pairs:
+            for m in ("mx", "my"):
+                cells[f"{m}:{pair}"] = cells[f"{m}:{pair}"] * cells[f"n:{pair}"]
+        merged = cells.groupby(self.KEYS, sort=False, observed=True).sum().reset_index()
+
+        for pair in self.pairs:
+            n = merged[f"n:{pair}"].to_numpy()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mx = np.nan_to_num(merged[f"mx:{pair}"].to_numpy() / n)
+                my = np.nan_to_num(merged[f"my:{pair}"].to_numpy() / n)
+            merged[f"mx:{pair}"], merged[f"my:{pair}"] = mx, my
+            parts = [cells[f"{c}:{pair}"].to_numpy() for c in ("n", "mx", "my")]
+            extra = self._spread(*parts, mx[codes], my[codes])
+            for stat, values in zip(("cxx", "cyy", "cxy"), extra):
+                merged[f"{stat}:{pair}"] += np.bincount(codes, weights=values, minlength=len(merged))
+        self.cells = merged
+        self._positions = None
+        return self
+
+    @staticmethod
+    def _spread(n, sum_x, sum_y, pooled_x, pooled_y):
+        """Chan et al.'s correction when parts with these counts and sums are
+        pooled around the given means: n * (part mean - pooled mean) products."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dx = np.nan_to_num(sum_x / n) - pooled_x
+            dy = np.nan_to_num(sum_y / n) - pooled_y
+        return n * dx * dx, n * dy * dy, n * dx * dy
+
+    def copy(self):
+        twin = copy.copy(self)
+        twin.cells = self.cells.copy()
+        twin._positions = None
+        return twin
+
+    def add_row(self, row):
+        """Count one more row: a dict with the KEYS and any of the value columns."""
+        self._apply(row, 1)
+
+    def remove_row(self, row):
+        """Take back a row given to add_row (or one of the rows the cube was built from)."""
+        self._apply(row, -1)
+
+    def add_rows(self, rows):
+        """Count many add_row dicts at once, by building their cube and merging it in.
+
+        Much cheaper than add_row per row for more than a few dozen rows;
+        each one can still be taken back with remove_row.
+        """
+        df = pd.DataFrame(list(rows))
+        if df.empty:
+            return
+        df = df.reindex(columns=list(dict.fromkeys(self.KEYS + self.MEAN_COLS + self.corr_cols)))
+        # Share the cells' categories, so the merged keys stay categorical.
+        for key in self.KEYS:
+            if isinstance(self.cells[key].dtype, pd.CategoricalDtype):
+                new = pd.Index(df[key].unique()).difference(self.cells[key].cat.categories)
+                if len(new):
+                    self.cells[key] = self.cells[key].cat.add_categories(new)
+                df[key] = pd.Categorical(df[key], dtype=self.cells[key].dtype)
+        self.merge(type(self)(df))
+
+    def _cell(self, key, create):
+        if self._positions is None:
+            keys = zip(*(self.cells[k].tolist() for k in self.KEYS))
+            self._positions = {k: i for i, k in enumerate(keys)}
+        if key not in self._positions:
+            if not create:
+                raise KeyError(f"no rows counted for {key}")
+            # The one step that isn't O(1): a new key combination adds a cell.
+            cells = self.cells
+            for k, value in zip(self.KEYS, key):
+                if isinstance(cells[k].dtype, pd.CategoricalDtype):
+                    if value not in cells[k].cat.categories:
+                        cells[k] = cells[k].cat.add_categories([value])
+                elif pd.api.types.is_integer_dtype(cells[k].dtype):
+                    # e.g. a My Records year of 40000 in the schema's int16 year
+                    limits = np.iinfo(cells[k].dtype)
+                    if not limits.min <= value <= limits.max:
+                        cells[k] = cells[k].astype("int64")
+            values = dict(zip(self.KEYS, key))
+            new = pd.DataFrame({c: pd.Series([values.get(c, 0)], dtype=cells[c].dtype)
+                                for c in cells.columns})
+            self.cells = pd.concat([cells, new], ignore_index=True)
+            self._positions[key] = len(cells)
+        return self._positions[key]
+
+    def _apply(self, row, sign):
+        pos   = self._cell(tuple(row[k] for k in self.KEYS), create=sign > 0)
+        cells = self.cells
+        loc   = cells.columns.get_loc
+
+        def get(col):
+            return cells.iat[pos, loc(col)]
+
+        def put(col, value):
+            cells.iat[pos, loc(col)] = value
+
+        put("rows", get("rows") + sign)
+        if get("rows") == 0:
+            self._emptied = True
+        for col in self.MEAN_COLS:
+            value = float(row.get(col, np.nan))
+            if not np.isnan(value):
+                put(f"sum:{col}", get(f"sum:{col}") + sign * value)
+                put(f"n:{col}",   get(f"n:{col}") + sign)
+
+        # Welford's update of the pair's count, means and co-moments; with
+        # sign -1 it undoes the update that added the row.
+        for pair in self.pairs:
+            a, b = pair.split(":")
+            x, y = float(row.get(a, np.nan)), float(row.get(b, np.nan))
+            if np.isnan(x) or np.isnan(y):
+                continue
+            n  = get(f"n:{pair}") + sign
+            mx = get(f"mx:{pair}")
+            my = get(f"my:{pair}")
+            put(f"n:{pair}", n)
+            if n == 0:
+                for stat in ("mx", "my", "cxx", "cyy", "cxy"):
+                    put(f"{stat}:{pair}", 0.0)
+                continue
+            new_mx = mx + sign * (x - mx) / n
+            new_my = my + sign * (y - my) / n
+            put(f"mx:{pair}", new_mx)
+            put(f"my:{pair}", new_my)
+            put(f"cxx:{pair}", get(f"cxx:{pair}") + sign * (x - mx) * (x - new_mx))
+            put(f"cyy:{pair}", get(f"cyy:{pair}") + sign * (y - my) * (y - new_my))
+            put(f"cxy:{pair}", get(f"cxy:{pair}") + sign * (x - mx) * (y - new_my))
+
+    def select(self, year=None, industry=None):
+        """Cells matching the given filters (None means all)."""
+        cells = self.cells
+        if self._emptied:
+            cells = cells[cells["rows"] > 0]
+        if year is not None:
+            cells = cells[cells["year"] == year]
+        if industry is not None:
+            cells = cells[cells["industry"] == industry]
+        return cells
+
+    @staticmethod
+    def count(cells):
+        return int(cells["rows"].sum())
+
+    @staticmethod
+    def mean_by(cells, key, col):
+        totals = cells.groupby(key, observed=True)[[f"sum:{col}", f"n:{col}"]].sum()
+        return (totals[f"sum:{col}"] / totals[f"n:{col}"]).rename(col)
+
+    def corr(self, cells):
+        cols = self.corr_cols
+        matrix = pd.DataFrame(np.nan, index=cols, columns=cols)
+        for a, b in itertools.combinations_with_replacement(cols, 2):
+            pair = f"{a}:{b}"
+            n  = cells[f"n:{pair}"].to_numpy()
+            sx = cells[f"mx:{pair}"].to_numpy() * n
+            sy = cells[f"my:{pair}"].to_numpy() * n
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pooled_x, pooled_y = sx.sum() / n.sum(), sy.sum() / n.sum()
+            cxx, cyy, cxy = (cells[f"{c}:{pair}"].sum() + extra.sum() for c, extra in
+                             zip(("cxx", "cyy", "cxy"), self._spread(n, sx, sy, pooled_x, pooled_y)))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                matrix.loc[a, b] = matrix.loc[b, a] = cxy / np.sqrt(cxx * cyy)
+        return matrix
+
+
+# Worker side of AggregateCube.parallel: the shared columns, attached
+# once per worker process.
+_shared_blocks  = []
+_shared_columns = {}
+
+
+def _integral_keys(frame, keys):
+    # A key column that was float only because of its blanks (e.g. year)
+    # goes back to integers once those rows are dropped, so it groups and
+    # prints like the rest of the data.
+    for key in keys:
+        column = frame[key]
+        if pd.api.types.is_float_dtype(column) and (column % 1 == 0).all():
+            frame[key] = column.astype("int64")
+
+
+def _as_numpy(col):
+    # Plain numpy columns are shared as they are (float32 stays float32);
+    # nullable extension columns become float64 with NaN.
+    if isinstance(col.dtype, np.dtype):
+        return col.to_numpy()
+    return col.to_numpy("float64", na_value=np.nan)
+
+
+def _attach_columns(spec, n_rows):
+    for name, block_name, dtype in spec:
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared_blocks.append(block)
+        _shared_columns[name] = np.ndarray(n_rows, dtype, buffer=block.buf)
+
+
+def _cube_of_rows(start, stop):
+    frame = pd.DataFrame({name: values[start:stop] for name, values in _shared_columns.items()},
+                         copy=False)
+    return AggregateCube(frame)
+
+
+def build_cube(df, workers=None):
+    """The cube of df, built in parallel when it is big enough to pay off."""
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(df) >= PARALLEL_MIN_ROWS:
+        return AggregateCube.parallel(df, workers)
+    return AggregateCube(df)
+
+
+def risk_category(percent):
+    """The dataset's automation_risk_category for an automation risk %."""
+    return next(label for limit, label in RISK_CATEGORIES if percent < limit)
+
+
+def top_k(series, k):
+    """The k largest values of a Series, largest first, via a heap."""
+    best = heapq.nlargest(k, series.dropna().items(), key=lambda item: item[1])
+    return pd.Series([v for _, v in best], dtype=series.dtype, name=series.name,
+                     index=pd.Index([i for i, _ in best], name=series.index.name))
+
+
+# ==================================================
+# PART II - Loading: schema and columnar cache
+# ==================================================
+
+def apply_dataset_schema(df):
+    """Cast the dataset's columns to DATASET_SCHEMA (missing columns are skipped).
+
+    int16 can't hold a blank, so an integer column with one keeps the
+    float64 read_csv gave it.
+    """
+    dtypes = {col: dtype for col, dtype in DATASET_SCHEMA.items()
+              if col in df.columns and not (dtype.startswith("int") and df[col].isna().any())}
+    return df.astype(dtypes)
+
+
+class DatasetCache:
+    """Sidecar folder of .npy columns next to the dataset CSV.
+
+    Numeric columns are saved as-is, text and categorical columns as
+    integer codes plus a list of labels. Launches memory-map the .npy
+    files instead of parsing the CSV. The cache is reused while the CSV's
+    mtime and size match, or, if only the mtime changed, while its SHA-1
+    still matches. ``prepare`` runs on a freshly parsed frame before it is
+    cached (e.g. apply_dataset_schema); ``prepare_key`` describes it, and a
+    cache written with a different key is rebuilt.
+    """
+
+    VERSION = 3
+
+    def __init__(self, csv_path, prepare=None, prepare_key=None):
+        self.csv_path    = csv_path
+        self.prepare     = prepare
+        self.prepare_key = prepare_key
+        self.cache_dir = csv_path + ".cache"
+        self.meta_path = os.path.join(self.cache_dir, "meta.json")
+
+    def load(self):
+        df = self._load_cached()
+        if df is None:
+            df = pd.read_csv(self.csv_path)
+            df.columns = df.columns.str.strip()
+            if self.prepare is not None:
+                df = self.prepare(df)
+            try:
+                self.save(df)
+            except OSError:
+                pass    # read-only folder: just run without a cache
+        return df
+
+    def _source_hash(self):
+        h = hashlib.sha1()
+        with open(self.csv_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != self.VERSION or meta.get("prepare_key") != self.prepare_key:
+            return None
+        return meta
+
+    def _write_meta(self, meta):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _load_cached(self):
+        meta = self._read_meta()
+        if meta is None:
+            return None
+        st = os.stat(self.csv_path)
+        if (meta["mtime_ns"], meta["size"]) != (st.st_mtime_ns, st.st_size):
+            if meta["size"] != st.st_size or meta["sha1"] != self._source_hash():
+                return None
+            meta["mtime_ns"] = st.st_mtime_ns
+            try:
+                self._write_meta(meta)
+            except OSError:
+                pass
+        try:
+            columns = {}
+            for i, (col, kind) in enumerate(zip(meta["columns"], meta["kinds"])):
+                values = np.load(os.path.join(self.cache_dir, f"{i}.npy"), mmap_mode="r")
+                if kind == "codes":
+                    labels = np.load(os.path.join(self.cache_dir, f"{i}.labels.npy"))
+                    # Code -1 marks a missing value; it picks the trailing None.
+                    labels = np.append(labels.astype(object), None)
+                    values = labels[values]
+                elif kind == "category":
+                    labels = np.load(os.path.join(self.cache_dir, f"{i}.labels.npy"))
+                    values = pd.Categorical.from_codes(values, categories=labels)
+                columns[col] = values
+        except (OSError, ValueError):
+            return None
+        return pd.DataFrame(columns)
+
+    def save(self, df):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Drop the old meta first so a half-written cache is never trusted.
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+        kinds = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                np.save(os.path.join(self.cache_dir, f"{i}.npy"), series.cat.codes.to_numpy())
+                np.save(os.path.join(self.cache_dir, f"{i}.labels.npy"),
+                        np.asarray(series.cat.categories, dtype=str))
+                kinds.append("category")
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                np.save(os.path.join(self.cache_dir, f"{i}.npy"), series.to_numpy())
+                kinds.append("values")
+            else:
+                codes, labels = pd.factorize(series)
+                np.save(os.path.join(self.cache_dir, f"{i}.npy"), codes.astype("int32"))
+                np.save(os.path.join(self.cache_dir, f"{i}.labels.npy"),
+                        np.asarray(labels, dtype=str))
+                kinds.append("codes")
+        st = os.stat(self.csv_path)
+        self._write_meta({
+            "version":     self.VERSION,
+            "prepare_key": self.prepare_key,
+            "mtime_ns":    st.st_mtime_ns,
+            "size":        st.st_size,
+            "sha1":        self._source_hash(),
+            "columns":     list(df.columns),
+            "kinds":       kinds,
+        })
+
+
+def load_dataset(path=DATASET_FILE):
+    if os.path.exists(path):
+        return DatasetCache(path, prepare=apply_dataset_schema,
+                            prepare_key=DATASET_SCHEMA).load()
+    return pd.DataFrame()
+
+
+# ==================================================
+# PART III - Report: Q1-Q5 and the correlation matrix
+# ==================================================
+
+def analyze(cube, year=None, industry=None):
+    """All report figures for one Year/Industry filter (None means All).
+
+    Values are rounded the way the report prints them.
+    """
+    cells = cube.select(year, industry)
+    corr = None
+    if cube.corr_cols == cube.CORR_COLS:
+        corr = cube.corr(cells).round(3)
+    return {
+        "year":     year,
+        "industry": industry,
+        "records":  cube.count(cells),
+        "q1": cube.mean_by(cells, "industry", "automation_risk_percent").sort_values(ascending=False).round(2),
+        "q2": cube.mean_by(cells, "country", "ai_replacement_score").sort_values(ascending=False).round(2),
+        "q3": cube.mean_by(cells, "automation_risk_category", "salary_change_percent").round(2),
+        "q4": pd.DataFrame({col: cube.mean_by(cells, "year", col)
+                            for col in ["ai_adoption_level", "reskilling_urgency_score"]}).round(2),
+        "q5": top_k(cube.mean_by(cells, "job_role", "salary_before_usd"), 10).round(2),
+        "corr": corr,
+    }
+
+
+def _plain(value):
+    # numpy scalars -> Python numbers, NaN -> None (JSON has no NaN)
+    value = value.item() if hasattr(value, "item") else value
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def report_to_json(result):
+    def series(s):
+        return {str(k): _plain(v) for k, v in s.items()}
+
+    return {
+        "year":     result["year"] if result["year"] is not None else "All",
+        "industry": result["industry"] if result["industry"] is not None else "All",
+        "records":  result["records"],
+        "q1_avg_risk_by_industry":        series(result["q1"]),
+        "q2_avg_ai_score_by_country":     series(result["q2"]),
+        "q3_avg_salary_change_by_risk":   series(result["q3"]),
+        "q4_yearly_adoption":             {str(yr): series(row) for yr, row in result["q4"].iterrows()},
+        "q5_top_roles_by_salary_before":  series(result["q5"]),
+        "correlation": None if result["corr"] is None else
+                       {str(a): series(row) for a, row in result["corr"].iterrows()},
+    }
+
+
+REPORT_FIELDS = ["year", "industry", "question", "group", "metric", "value"]
+
+
+def report_to_rows(result):
+    """The report in long format, one row per number (for CSV output)."""
+    year     = result["year"] if result["year"] is not None else "All"
+    industry = result["industry"] if result["industry"] is not None else "All"
+
+    def row(question, group, metric, value):
+        return {"year": year, "industry": industry, "question": question,
+                "group": group, "metric": metric, "value": _plain(value)}
+
+    yield row("records", "", "count", result["records"])
+    for q in ("q1", "q2", "q3", "q5"):
+        for group, value in result[q].items():
+            yield row(q, group, result[q].name, value)
+    for yr, values in result["q4"].iterrows():
+        for metric, value in values.items():
+            yield row("q4", int(yr), metric, value)
+    if result["corr"] is not None:
+        for a, values in result["corr"].iterrows():
+            for b, value in values.items():
+                yield row("corr", a, b, value)
+
+
+def filter_values(df):
+    """The years and industries the filters offer: sorted, blanks left out.
+
+    Years are ints even when a blank made the column float64.
+    """
+    years      = sorted(int(year) for year in df["year"].dropna().unique())
+    industries = sorted(df["industry"].dropna().unique().tolist())
+    return years, industries
+
+
+def filter_combinations(df):
+    """Every (year, industry) pair the app's comboboxes can select, All included."""
+    years, industries = filter_values(df)
+    return list(itertools.product([None] + years, [None] + industries))
+
+
+def filter_frame(df, year=None, industry=None):
+    mask = np.ones(len(df), dtype=bool)
+    if year is not None:
+        mask &= (df["year"] == year).to_numpy()
+    if industry is not None:
+        mask &= (df["industry"] == industry).to_numpy()
+    return df[mask]
+
+
+# ==================================================
+# PART IV - Charts
+# ==================================================
+
+# Each chart has a *_data function (the pandas work, safe to run on a
+# worker thread or process) and a draw_* function that only draws.
+# Data functions take an optional AggregateCube of the same rows; the
+# group-bys it already holds are then read from its cells instead of
+# rescanning df.
+
+DENSITY_CMAP = LinearSegmentedColormap.from_list("density", ["#F2C4CB", MAROON, MAROON2])
+
+
+def scatter_data(x, y):
+    """Points for a scatter plot, or 2D-binned counts above LOD_POINTS."""
+    x, y = x.to_numpy("float64", na_value=np.nan), y.to_numpy("float64", na_value=np.nan)
+    if len(x) <= LOD_POINTS:
+        return {"x": x, "y": y}
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    if not len(x):
+        return {"x": x, "y": y}
+    # Same bins as np.histogram2d(x, y, LOD_BINS), but the bins are equal
+    # width, so each point's bin is arithmetic instead of a searchsorted.
+    extent = (x.min(), x.max(), y.min(), y.max())
+    ix = _bin_index(x, extent[0], extent[1], LOD_BINS)
+    iy = _bin_index(y, extent[2], extent[3], LOD_BINS)
+    counts = np.bincount(ix * LOD_BINS + iy, minlength=LOD_BINS * LOD_BINS)
+    return {"counts": counts.reshape(LOD_BINS, LOD_BINS), "extent": extent}
+
+
+def _bin_index(values, low, high, bins):
+    if high == low:
+        return np.zeros(len(values), dtype=np.intp)
+    index = ((values - low) * (bins / (high - low))).astype(np.intp)
+    return np.minimum(index, bins - 1)    # the maximum goes in the last bin
+
+
+def draw_scatter(fig, ax, data):
+    if "counts" not in data:
+        ax.scatter(data["x"], data["y"], alpha=0.3, s=10, color=MAROON)
+        return
+    # Empty bins stay transparent; the log scale keeps sparse areas visible.
+    image = ax.imshow(np.ma.masked_equal(data["counts"].T, 0), origin="lower",
+                      extent=data["extent"], aspect="auto", interpolation="nearest",
+                      cmap=DENSITY_CMAP, norm=LogNorm())
+    fig.colorbar(image, ax=ax, label="Rows")
+
+
+def histogram_data(values, bins=HIST_BINS):
+    """Bin counts and mean of a column, so drawing doesn't touch every row."""
+    values = values.dropna().to_numpy("float64")
+    counts, edges = np.histogram(values, bins=bins)
+    return {"counts": counts, "edges": edges, "mean": values.mean() if len(values) else np.nan}
+
+
+def draw_histogram(ax, data, **style):
+    edges = data["edges"]
+    ax.hist(edges[:-1], edges, weights=data["counts"], **style)
+
+
+def overview_data(df, cube=None):
+    if cube is None:
+        risk_counts = df["automation_risk_category"].value_counts()
+        by_industry = df.groupby("industry")["ai_replacement_score"].mean()
+        trend       = df.groupby("year")[["ai_adoption_level", "reskilling_urgency_score"]].mean()
+    else:
+        cells = cube.cells
+        risk_counts = (cells.groupby("automation_risk_category", observed=True)["rows"].sum()
+                            .sort_values(ascending=False).rename("count"))
+        by_industry = cube.mean_by(cells, "industry", "ai_replacement_score")
+        trend       = pd.DataFrame({col: cube.mean_by(cells, "year", col)
+                                    for col in ["ai_adoption_level", "reskilling_urgency_score"]})
+    return {
+        "risk_counts": risk_counts,
+        "by_industry": by_industry.sort_values(),
+        "trend":       trend,
+        "scatter":     scatter_data(df["automation_risk_percent"], df["salary_change_percent"]),
+    }
+
+
+def draw_overview(fig, data):
+    axes = fig.subplots(2, 2)
+    fig.suptitle("Overview Dashboard", color=MAROON, fontsize=13, fontweight="bold")
+
+    ax = axes[0, 0]
+    rc = data["risk_counts"]
+    ax.pie(rc.values, labels=rc.index, autopct="%1.1f%%",
+           colors=[MAROON, YELLOW, "#CCCCCC"], startangle=120,
+           wedgeprops=dict(edgecolor=WHITE, linewidth=2))
+    ax.set_title("Automation Risk Categories")
+
+    ax = axes[0, 1]
+    by_ind = data["by_industry"]
+    ax.barh(by_ind.index, by_ind.values, color=MAROON, edgecolor=WHITE)
+    ax.set_title("Avg AI Replacement Score by Industry")
+    ax.set_xlabel("Score")
+
+    ax = axes[1, 0]
+    trend = data["trend"]
+    ax.plot(trend.index, trend["ai_adoption_level"], marker="o",
+            color=MAROON, label="AI Adoption", linewidth=2)
+    ax.plot(trend.index, trend["reskilling_urgency_score"], marker="s",
+            color=YELLOW, label="Reskilling Urgency", linewidth=2)
+    ax.set_title("AI Adoption vs Reskilling Urgency")
+    ax.legend(fontsize=8)
+    ax.grid(True, alpha=0.3)
+
+    ax = axes[1, 1]
+    draw_scatter(fig, ax, data["scatter"])
+    ax.axhline(0, color="red", linestyle="--", linewidth=1)
+    ax.set_title("Automation Risk vs Salary Change %")
+    ax.set_xlabel("Automation Risk %")
+    ax.set_ylabel("Salary Change %")
+
+
+def risk_data(df, cube=None):
+    industries = filter_values(df)[1]
+    return {
+        "industries": industries,
+        "values": [df[df["industry"] == ind]["automation_risk_percent"].dropna().values
+                   for ind in industries],
+    }
+
+
+def draw_risk(fig, data):
+    ax = fig.add_subplot(111)
+    fig.suptitle("Automation Risk % by Industry (Box Plot)",
+                 color=MAROON, fontsize=13, fontweight="bold")
+    bp = ax.boxplot(data["values"], patch_artist=True,
+                    medianprops=dict(color=YELLOW, linewidth=2))
+    # boxplot(labels=...) was removed in matplotlib 3.11; this works on all versions.
+    ax.set_xticklabels(data["industries"])
+    for patch in bp["boxes"]:
+        patch.set_facecolor(MAROON)
+        patch.set_alpha(0.6)
+    ax.set_ylabel("Automation Risk %")
+    ax.grid(True, axis="y", alpha=0.3)
+    setp(ax.get_xticklabels(), rotation=20, ha="right", fontsize=9)
+
+
+def salary_data(df, cube=None):
+    return {
+        "by_country": df.groupby("country")[["salary_before_usd", "salary_after_usd"]].mean().sort_values("salary_before_usd"),
+        "change":     histogram_data(df["salary_change_percent"]),
+    }
+
+
+def draw_salary(fig, data):
+    axes = fig.subplots(1, 2)
+    fig.suptitle("Salary Impact of AI Automation",
+                 color=MAROON, fontsize=13, fontweight="bold")
+
+    ax = axes[0]
+    grp = data["by_country"]
+    x = range(len(grp))
+    w = 0.38
+    ax.bar([i - w/2 for i in x], grp["salary_before_usd"] / 1000, w,
+           label="Before", color=MAROON, alpha=0.85)
+    ax.bar([i + w/2 for i in x], grp["salary_after_usd"] / 1000, w,
+           label="After",  color=YELLOW, alpha=0.85)
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(grp.index, rotation=30, ha="right", fontsize=8)
+    ax.set_ylabel("Avg Salary (USD '000)")
+    ax.set_title("Salary Before vs After by Country")
+    ax.legend(fontsize=8)
+    ax.grid(True, axis="y", alpha=0.3)
+
+    ax = axes[1]
+    change = data["change"]
+    draw_histogram(ax, change, color=MAROON, edgecolor=WHITE, alpha=0.85)
+    ax.axvline(change["mean"], color=YELLOW, linestyle="--", linewidth=2,
+               label=f"Mean: {change['mean']:.1f}%")
+    ax.axvline(0, color="red", linestyle="--", linewidth=1, label="0% (no change)")
+    ax.set_title("Distribution of Salary Change %")
+    ax.set_xlabel("Salary Change %")
+    ax.set_ylabel("Count")
+    ax.legend(fontsize=8)
+    ax.grid(True, alpha=0.3)
+
+
+TREND_METRICS = {
+    "ai_replacement_score":     (MAROON,    "AI Replacement Score"),
+    "reskilling_urgency_score":  (YELLOW,    "Reskilling Urgency"),
+    "skill_gap_index":           ("#888888", "Skill Gap Index"),
+    "wage_volatility_index":     ("#CC6600", "Wage Volatility"),
+}
+
+
+def trend_data(df, cube=None):
+    return {
+        "trend": df.groupby("year")[list(TREND_METRICS)].mean(),
+        "years": filter_values(df)[0],
+    }
+
+
+def draw_trend(fig, data):
+    ax = fig.add_subplot(111)
+    fig.suptitle("Key Metrics Trend Over Years (2020-2026)",
+                 color=MAROON, fontsize=13, fontweight="bold")
+    for col, (color, label) in TREND_METRICS.items():
+        trend = data["trend"][col]
+        ax.plot(trend.index, trend.values, marker="o", color=color,
+                label=label, linewidth=2, markersize=5)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Average Score")
+    ax.legend(fontsize=9)
+    ax.grid(True, alpha=0.3)
+    ax.set_xticks(data["years"])
+
+
+def jobs_data(df, cube=None):
+    cols = ["automation_risk_percent", "salary_before_usd"]
+    if cube is None:
+        by_role = df.groupby("job_role")[cols].mean()
+    else:
+        by_role = pd.DataFrame({col: cube.mean_by(cube.cells, "job_role", col) for col in cols})
+    return {
+        "top_risk":   by_role["automation_risk_percent"].sort_values(ascending=False).head(10),
+        "top_salary": by_role["salary_before_usd"].sort_values(ascending=False).head(10),
+    }
+
+
+def draw_jobs(fig, data):
+    axes = fig.subplots(1, 2)
+    fig.suptitle("Top 10 Job Roles Comparison",
+                 color=MAROON, fontsize=13, fontweight="bold")
+
+    top_risk = data["top_risk"]
+    ax = axes[0]
+    ax.barh(top_risk.index[::-1], top_risk.values[::-1],
+            color=MAROON, edgecolor=WHITE, alpha=0.85)
+    ax.set_title("Highest Automation Risk")
+    ax.set_xlabel("Avg Automation Risk %")
+    ax.grid(True, axis="x", alpha=0.3)
+
+    top_sal = data["top_salary"]
+    ax = axes[1]
+    ax.barh(top_sal.index[::-1], top_sal.values[::-1] / 1000,
+            color=YELLOW, edgecolor=WHITE, alpha=0.85)
+    ax.set_title("Highest Salary Before AI")
+    ax.set_xlabel("Avg Salary (USD '000)")
+    ax.grid(True, axis="x", alpha=0.3)
+
+
+CHARTS = {
+    "Overview":               (overview_data, draw_overview),
+    "Risk by Industry":       (risk_data,     draw_risk),
+    "Salary Before vs After": (salary_data,   draw_salary),
+    "Trend Over Years":       (trend_data,    draw_trend),
+    "Top Job Roles":          (jobs_data,     draw_jobs),
+}
+
+
+def draw_chart(name, data):
+    matplotlib.rcParams.update(CHART_RC)
+    fig = Figure(figsize=(10, 6), tight_layout=True)
+    CHARTS[name][1](fig, data)
+    return fig
+
+
+def render_chart(name, df, cube=None):
+    return draw_chart(name, CHARTS[name][0](df, cube))
+
+
+# ==================================================
+# Command line
+# ==================================================
+
+_worker_df = None
+
+
+def _init_chart_worker(dataset):
+    global _worker_df
+    matplotlib.use("Agg")
+    _worker_df = load_dataset(dataset)
+
+
+def _render_chart_job(name, year, industry, path):
+    fig = render_chart(name, filter_frame(_worker_df, year, industry))
+    fig.savefig(path, dpi=150, bbox_inches="tight")
+    return path
+
+
+def chart_filename(name, year, industry):
+    parts = [name, str(year) if year is not None else "all", industry or "all"]
+    return "_".join(p.lower().replace(" ", "-") for p in parts) + ".png"
+
+
+def _selected_filters(args, df):
+    if args.all_filters:
+        return filter_combinations(df)
+    return [(args.year, args.industry)]
+
+
+def cmd_report(args):
+    if not os.path.exists(args.dataset):
+        sys.exit(f"Dataset not found: {args.dataset}")
+    if args.chunksize:
+        # Streaming: the dataset never has to fit in memory.
+        cube = AggregateCube.from_csv(args.dataset, args.chunksize, prepare=apply_dataset_schema)
+        df = cube.cells
+    else:
+        df = load_dataset(args.dataset)
+        cube = build_cube(df, args.workers)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = None
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+        # One filter at a time, flushed as we go, so long runs stream.
+        for year, industry in _selected_filters(args, df):
+            result = analyze(cube, year, industry)
+            if writer is None:
+                out.write(json.dumps(report_to_json(result)) + "\n")
+            else:
+                writer.writerows(report_to_rows(result))
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def cmd_charts(args):
+    df = load_dataset(args.dataset)
+    if df.empty:
+        sys.exit(f"Dataset not found: {args.dataset}")
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    jobs = [(name, year, industry,
+             os.path.join(args.out_dir, chart_filename(name, year, industry)))
+            for year, industry in _selected_filters(args, df)
+            for name in (args.chart or CHARTS)]
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             initializer=_init_chart_worker,
+                             initargs=(args.dataset,)) as pool:
+        futures = {pool.submit(_render_chart_job, *job): job for job in jobs}
+        for future in as_completed(futures):
+            name, year, industry, path = futures[future]
+            try:
+                print(future.result(), flush=True)
+            except Exception as err:
+                failed += 1
+                print(f"FAILED {name} (year={year or 'All'}, industry={industry or 'All'}): {err}",
+                      file=sys.stderr, flush=True)
+    if failed:
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=DATASET_FILE, help="dataset CSV (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(p):
+        p.add_argument("--year", type=int, help="only this year (default: All)")
+        p.add_argument("--industry", help="only this industry (default: All)")
+        p.add_argument("--all-filters", action="store_true",
+                       help="every Year/Industry combination, including All")
+
+    p = sub.add_parser("report", help="Q1-Q5 and correlation as JSON lines or CSV")
+    add_filters(p)
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    p.add_argument("--chunksize", type=int,
+                   help="read the CSV this many rows at a time, for datasets larger than RAM")
+    p.add_argument("--workers", type=int, default=os.cpu_count(),
+                   help=f"processes building the cube (used from {PARALLEL_MIN_ROWS:,} rows)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("charts", help="render charts to PNG in worker processes")
+    add_filters(p)
+    p.add_argument("--chart", action="append", choices=list(CHARTS),
+                   help="chart to render (repeatable, default: all)")
+    p.add_argument("--out-dir", default="charts")
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.set_defaults(func=cmd_charts)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,752 @@
+"""
+Benchmarks for the Records Management System.
+
+Run from this folder, for example:
+    python benchmarks.py journal
+    python benchmarks.py journal --rows 4000 --deletes 2000
+    python benchmarks.py cube --sizes 15000 150000 1500000
+    python benchmarks.py startup
+    python benchmarks.py search --records 1000000
+    python benchmarks.py import --rows 50000
+    python benchmarks.py memory --rows 200000
+    python benchmarks.py backends --records 20000
+    python benchmarks.py stress --procs 4 --ops 500
+    python benchmarks.py stream --rows 1000000 --chunksize 200000
+    python benchmarks.py parallel --rows 4000000 --workers 1 2 4 8
+    python benchmarks.py render --sizes 15000 1000000 3000000
+    python benchmarks.py incremental --rows 1500000 --changes 1000
+
+With the default 10k deletes the rewrite paths take several minutes.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import importlib.util
+
+import analysis
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(script_dir, "Midterm Output Part 1 - Records Management.py")
+
+
+def load_app():
+    # The app script has spaces in its name, so it can't be imported normally.
+    spec = importlib.util.spec_from_file_location("records_app", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["records_app"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+# Report figures are rounded to 2 decimals (correlations to 3). Cubes that
+# add the same values in another order (workers, chunks) can land on the
+# other side of a rounding tie, so figures may differ by one unit in the
+# last printed place.
+REPORT_TOLERANCE = 0.011
+
+
+def report_differences(a, b, path=""):
+    """Paths where two report_to_json results differ by more than REPORT_TOLERANCE."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        if a.keys() != b.keys():
+            return [path or "/"]
+        return [diff for key in a for diff in report_differences(a[key], b[key], f"{path}/{key}")]
+    if isinstance(a, float) and isinstance(b, float):
+        return [] if abs(a - b) <= REPORT_TOLERANCE else [path]
+    return [] if a == b else [path]
+
+
+def make_records(app, n):
+    return [app.JobRecord(i, f"Role {i % 50}", "Technology", f"Country {i % 20}",
+                          2020 + i % 7, 50.0, 40.0, 90000, "", "2026-01-01 00:00")
+            for i in range(n)]
+
+
+# --------------------------------------------------
+# journal: 10k deletes, rewrite-everything vs journal
+# --------------------------------------------------
+
+def bench_journal(args):
+    app = load_app()
+    records = make_records(app, args.rows)
+    to_delete = [str(i) for i in range(0, args.rows, max(1, args.rows // args.deletes))][:args.deletes]
+
+    print(f"{len(to_delete):,} deletes from a file of {args.rows:,} records\n")
+    print(f"  {'Repository':<34} {'Total (s)':>10} {'Per delete (ms)':>16}")
+
+    repos = [
+        ("CachedCSVRepository (rewrite)", lambda p: app.CachedCSVRepository(p)),
+        ("JournaledCSVRepository",        lambda p: app.JournaledCSVRepository(p, args.threshold)),
+    ]
+    if args.include_uncached:
+        repos.insert(0, ("CSVRepository (rewrite)", lambda p: app.CSVRepository(p)))
+    for name, factory in repos:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "custom_records.csv")
+            app.CSVRepository(path).save_all(records)
+            manager = app.RecordManager(factory(path))
+
+            def run():
+                for rid in to_delete:
+                    manager.delete_record(rid)
+            elapsed, _ = timed(run)
+
+            left = len(app.CSVRepository(path).load_all())
+            if hasattr(manager.repo, "compact"):
+                manager.repo.compact()
+                left = len(app.CSVRepository(path).load_all())
+            assert left == args.rows - len(to_delete), (name, left)
+        print(f"  {name:<34} {elapsed:>10.2f} {elapsed / len(to_delete) * 1000:>16.3f}")
+
+
+# --------------------------------------------------
+# cube: Data Analysis latency, raw rescan vs aggregate cube
+# --------------------------------------------------
+
+def scale_dataset(df, n, seed=0):
+    """Resample the real dataset (with replacement) up to n rows."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return df.iloc[rng.integers(0, len(df), size=n)].reset_index(drop=True)
+
+
+def rescan_analysis(df, year, industry):
+    """The pre-cube _run_analysis: copy, filter and group the raw rows.
+
+    Returns the figures in analyze()'s shape, so report_to_json and
+    report_differences work on them.
+    """
+    df = df.copy()
+    if year is not None:
+        df = df[df["year"] == year]
+    if industry is not None:
+        df = df[df["industry"] == industry]
+    return {
+        "year":     year,
+        "industry": industry,
+        "records":  len(df),
+        "q1": df.groupby("industry")["automation_risk_percent"].mean().sort_values(ascending=False).round(2),
+        "q2": df.groupby("country")["ai_replacement_score"].mean().sort_values(ascending=False).round(2),
+        "q3": df.groupby("automation_risk_category")["salary_change_percent"].mean().round(2),
+        "q4": df.groupby("year")[["ai_adoption_level", "reskilling_urgency_score"]].mean().round(2),
+        "q5": df.groupby("job_role")["salary_before_usd"].mean().sort_values(ascending=False).head(10).round(2),
+        "corr": df[["skill_gap_index", "wage_volatility_index", "ai_disruption_intensity"]].corr().round(3),
+    }
+
+
+def bench_cube(args):
+    import pandas as pd
+    source = pd.read_csv(analysis.DATASET_FILE)
+    source.columns = source.columns.str.strip()
+    filters = [(None, None), (2024, None), (None, "Finance"), (2022, "Technology")]
+
+    print(f"Average over {len(filters)} Year/Industry filters\n")
+    print(f"  {'Rows':>10} {'Rescan (ms)':>12} {'Cube build (s)':>15} {'Cube query (ms)':>16} {'Cells':>8}")
+    for n in args.sizes:
+        df = scale_dataset(source, n)
+        rescan = sum(timed(rescan_analysis, df, y, i)[0] for y, i in filters) / len(filters)
+        build, cube = timed(analysis.AggregateCube, df)
+        query = sum(timed(analysis.analyze, cube, y, i)[0] for y, i in filters) / len(filters)
+        print(f"  {n:>10,} {rescan * 1000:>12.1f} {build:>15.2f} {query * 1000:>16.1f} {len(cube.cells):>8,}")
+
+
+# --------------------------------------------------
+# startup: dataset load, CSV parse vs columnar cache
+# --------------------------------------------------
+
+def bench_startup(args):
+    import pandas as pd
+    source = pd.read_csv(analysis.DATASET_FILE)
+
+    print(f"  {'Rows':>10} {'read_csv (s)':>13} {'Cold (s)':>10} {'Warm (s)':>10}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dataset.csv")
+            scale_dataset(source, n).to_csv(path, index=False)
+
+            parse, _ = timed(pd.read_csv, path)
+            cold, _  = timed(analysis.DatasetCache(path).load)    # parse + write cache
+            warm, _  = timed(analysis.DatasetCache(path).load)    # memory-mapped
+        print(f"  {n:>10,} {parse:>13.3f} {cold:>10.3f} {warm:>10.3f}")
+
+
+# --------------------------------------------------
+# schema: memory of the typed DataFrame + unchanged analysis
+# --------------------------------------------------
+
+def bench_schema(args):
+    import pandas as pd
+    raw = pd.read_csv(analysis.DATASET_FILE)
+    raw.columns = raw.columns.str.strip()
+    typed = analysis.apply_dataset_schema(raw)
+
+    before = raw.memory_usage(deep=True)
+    after  = typed.memory_usage(deep=True)
+    print(f"  {'Column':<30} {'Before (KB)':>12} {'After (KB)':>11}  dtype")
+    for col in raw.columns:
+        print(f"  {col:<30} {before[col] / 1024:>12,.1f} {after[col] / 1024:>11,.1f}  "
+              f"{raw[col].dtype} -> {typed[col].dtype}")
+    print(f"  {'Total':<30} {before.sum() / 1024:>12,.1f} {after.sum() / 1024:>11,.1f}  "
+          f"({after.sum() / before.sum():.0%} of original)\n")
+
+    # The cube of the compact frame against the original pandas report
+    # of the raw CSV, figure by figure.
+    typed_cube = analysis.AggregateCube(typed)
+    filters = analysis.filter_combinations(raw)
+    mismatches, ties = [], 0
+    for year, industry in filters:
+        a = analysis.report_to_json(rescan_analysis(raw, year, industry))
+        b = analysis.report_to_json(analysis.analyze(typed_cube, year, industry))
+        mismatches += [(year, industry, path) for path in report_differences(a, b)]
+        ties += sum(1 for name in a if json.dumps(a[name], sort_keys=True) != json.dumps(b[name], sort_keys=True))
+    if mismatches:
+        print(f"Analysis output CHANGED by more than {REPORT_TOLERANCE} in {len(mismatches)} figure(s):")
+        for year, industry, path in mismatches:
+            print(f"  year={year or 'All'} industry={industry or 'All'} {path}")
+        sys.exit(1)
+    print(f"Analysis output matches the pandas report of the raw CSV for all {len(filters)} "
+          f"Year/Industry filters, within {REPORT_TOLERANCE}")
+    print(f"({ties} result(s) differ in the last printed place, where a mean sits on a rounding tie).")
+
+    # A hand-edited CSV with blanks in the integer columns must still load,
+    # in memory and in chunks, with the blank-year rows left out of the cube.
+    messy = raw.copy()
+    messy.loc[messy.index[::500], "year"] = None
+    messy.loc[messy.index[1::700], "education_requirement_level"] = None
+    expected = len(messy.dropna(subset=analysis.AggregateCube.KEYS))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "messy.csv")
+        messy.to_csv(path, index=False)
+        loaded = analysis.load_dataset(path)
+        counts = {"load_dataset": analysis.analyze(analysis.AggregateCube(loaded))["records"],
+                  "from_csv": analysis.analyze(analysis.AggregateCube.from_csv(
+                      path, 4000, prepare=analysis.apply_dataset_schema))["records"]}
+    if any(count != expected for count in counts.values()):
+        print(f"CSV with blank years: expected {expected:,} records, got {counts}")
+        sys.exit(1)
+    print(f"CSV with blank years loads: {expected:,} records in memory and in chunks "
+          f"({len(messy) - expected} blank-year row(s) left out).")
+
+
+# --------------------------------------------------
+# search: search_by_name, linear scan vs SearchIndex
+# --------------------------------------------------
+
+SEARCH_ROLES = ["Data Analyst", "Accountant", "Software Engineer", "Truck Driver",
+                "HR Manager", "Teacher", "Customer Support Rep", "Mechanical Engineer",
+                "Marketing Specialist", "Financial Analyst"]
+SEARCH_COUNTRIES = ["USA", "UK", "Canada", "India", "Germany", "Japan",
+                    "Brazil", "Singapore", "Australia"]
+SEARCH_QUERIES = ["data", "engineer", "sing", "uk", "an", "a", "x", "driver", "zzz"]
+
+
+def linear_search(records, query):
+    # What search_by_name did before the index: scan every record.
+    query = query.lower()
+    return [r for r in records
+            if query in r.job_role.lower() or query in r.country.lower()]
+
+
+def bench_search(args):
+    app = load_app()
+    levels = ["", " I", " II", " III", " (Contract)"]
+    records = [app.JobRecord(i, SEARCH_ROLES[i % 10] + levels[i % 7 % 5], "Technology",
+                             SEARCH_COUNTRIES[i % 9], 2020 + i % 7, 50.0, 40.0, 90000,
+                             "", "2026-01-01 00:00")
+               for i in range(args.records)]
+
+    def build():
+        index = app.SearchIndex()
+        for r in records:
+            index.add(r)
+        return index
+    build_time, index = timed(build)
+    print(f"{args.records:,} records, index built in {build_time:.2f} s\n")
+    print(f"  {'Query':<10} {'Matches':>10} {'Linear (ms)':>12} {'Index (ms)':>11}")
+
+    for q in SEARCH_QUERIES:
+        linear, expected = timed(linear_search, records, q)
+        indexed, found = timed(index.search, q)
+        assert found == expected, q
+        print(f"  {q!r:<10} {len(found):>10,} {linear * 1000:>12.1f} {indexed * 1000:>11.1f}")
+
+
+# --------------------------------------------------
+# import: one add_record per row vs RecordManager.import_csv
+# --------------------------------------------------
+
+def bench_import(args):
+    app = load_app()
+    records = make_records(app, args.rows)
+
+    print(f"Importing {args.rows:,} records into an empty file\n")
+    print(f"  {'Method':<44} {'Total (s)':>10} {'Rows/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = os.path.join(tmp, "feed.csv")
+        app.CSVRepository(feed).save_all(records)
+
+        def one_by_one(manager):
+            for r in app.CSVRepository(feed).iter_all():
+                manager.add_record(r.rid, r.job_role, r.industry, r.country,
+                                   r.year, r.risk, r.ai_score, r.salary, r.notes)
+        runs = [
+            ("add_record per row (JournaledCSVRepository)", app.JournaledCSVRepository, one_by_one),
+            ("import_csv (JournaledCSVRepository)",         app.JournaledCSVRepository,
+             lambda manager: manager.import_csv(feed)),
+            ("import_csv (CSVRepository)",                  app.CSVRepository,
+             lambda manager: manager.import_csv(feed)),
+        ]
+        if args.include_uncached:
+            runs.insert(0, ("add_record per row (CSVRepository)", app.CSVRepository, one_by_one))
+        for n, (name, factory, run) in enumerate(runs):
+            path = os.path.join(tmp, f"records_{n}.csv")
+            manager = app.RecordManager(factory(path))
+            elapsed, _ = timed(run, manager)
+            assert len(manager.get_all_records()) == args.rows, name
+            print(f"  {name:<44} {elapsed:>10.2f} {args.rows / elapsed:>10,.0f}")
+
+        out = os.path.join(tmp, "export.csv")
+        elapsed, count = timed(manager.export_csv, out, ["ID", "Job Role", "Country"])
+        print(f"\n  export_csv of {count:,} records, 3 columns: {elapsed:.2f} s")
+
+
+# --------------------------------------------------
+# memory: tracemalloc of records as objects vs RecordTable
+# --------------------------------------------------
+
+class PlainRecord:
+    # What JobRecord was before __slots__: ten attributes in a __dict__.
+    def __init__(self, d):
+        self.rid, self.job_role, self.industry, self.country = d["ID"], d["Job Role"], d["Industry"], d["Country"]
+        self.year, self.risk, self.ai_score, self.salary = d["Year"], d["Risk %"], d["AI Score"], d["Salary (USD)"]
+        self.notes, self.date_added = d["Notes"], d["Date Added"]
+
+    def to_dict(self):
+        return {"ID": self.rid, "Job Role": self.job_role, "Industry": self.industry,
+                "Country": self.country, "Year": self.year, "Risk %": self.risk,
+                "AI Score": self.ai_score, "Salary (USD)": self.salary,
+                "Notes": self.notes, "Date Added": self.date_added}
+
+
+def traced(func, *args):
+    """Run func under tracemalloc; returns (seconds, retained bytes, peak bytes, result)."""
+    tracemalloc.start()
+    try:
+        elapsed, result = timed(func, *args)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, retained, peak, result
+
+
+def bench_memory(args):
+    import csv
+    app = load_app()
+
+    def dict_load(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return [PlainRecord(row) for row in csv.DictReader(f)]
+
+    def dict_save(path, records):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=app.JobRecord.FIELDS)
+            writer.writeheader()
+            for r in records:
+                writer.writerow(r.to_dict())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "custom_records.csv")
+        repo = app.CSVRepository(path)
+        repo.save_all(app.JobRecord(i, SEARCH_ROLES[i % 10], "Technology", SEARCH_COUNTRIES[i % 9],
+                                    2020 + i % 7, f"{i % 10000 / 100:.2f}", f"{i % 997 / 10:.1f}",
+                                    50000 + i % 90000, "", "2026-01-01 00:00")
+                      for i in range(args.rows))
+        print(f"{args.rows:,} records (tracemalloc; times include its overhead)\n")
+
+        print(f"  {'Load':<36} {'Time (s)':>9} {'Retained (MB)':>14} {'Peak (MB)':>10} {'Bytes/row':>10}")
+        loaded = {}
+        for name, load in [("DictReader -> plain objects", lambda: dict_load(path)),
+                           ("load_all -> slotted JobRecord", repo.load_all),
+                           ("load_table -> RecordTable", repo.load_table)]:
+            elapsed, retained, peak, loaded[name] = traced(load)
+            print(f"  {name:<36} {elapsed:>9.2f} {retained / 2**20:>14.1f} "
+                  f"{peak / 2**20:>10.1f} {retained / args.rows:>10.0f}")
+
+        print(f"\n  {'Save':<36} {'Time (s)':>9} {'Peak (MB)':>10}")
+        out = os.path.join(tmp, "out.csv")
+        with open(path, "rb") as f:
+            expected = f.read()
+        for name, save in [("DictWriter + to_dict per row",
+                            lambda: dict_save(out, loaded["DictReader -> plain objects"])),
+                           ("save_all (to_row)",
+                            lambda: app.CSVRepository(out).save_all(loaded["load_all -> slotted JobRecord"])),
+                           ("save_table",
+                            lambda: app.CSVRepository(out).save_table(loaded["load_table -> RecordTable"]))]:
+            elapsed, _, peak, _ = traced(save)
+            with open(out, "rb") as f:
+                assert f.read() == expected, name
+            print(f"  {name:<36} {elapsed:>9.2f} {peak / 2**20:>10.1f}")
+
+
+# --------------------------------------------------
+# backends: add/search/delete throughput, CSV vs SQLite
+# --------------------------------------------------
+
+def bench_backends(args):
+    import random
+    app = load_app()
+    rng = random.Random(0)
+    records = [app.JobRecord(i, SEARCH_ROLES[i % 10], "Technology", SEARCH_COUNTRIES[i % 9],
+                             2020 + i % 7, 50.0, 40.0, 90000, "", "2026-01-01 00:00")
+               for i in range(args.records)]
+    lookups = [str(rng.randrange(args.records)) for _ in range(args.lookups)]
+    deletes = rng.sample(range(args.records), args.deletes)
+
+    backends = [
+        ("JournaledCSVRepository", lambda tmp: app.JournaledCSVRepository(os.path.join(tmp, "r.csv"))),
+        ("SQLiteRepository",       lambda tmp: app.SQLiteRepository(os.path.join(tmp, "r.db"))),
+    ]
+    if args.include_uncached:
+        backends.insert(0, ("CSVRepository", lambda tmp: app.CSVRepository(os.path.join(tmp, "r.csv"))))
+
+    print(f"{args.records:,} adds, {args.lookups:,} ID lookups, "
+          f"{len(SEARCH_QUERIES) * 2} name searches, {args.deletes:,} deletes (operations/s)\n")
+    print(f"  {'Backend':<24} {'Add':>9} {'Bulk add':>10} {'By ID':>10} {'By name':>9} {'Delete':>9}")
+    for name, factory in backends:
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = app.RecordManager(factory(tmp))
+
+            def add():
+                for r in records:
+                    manager.add_record(r.rid, r.job_role, r.industry, r.country,
+                                       r.year, r.risk, r.ai_score, r.salary, r.notes)
+            t_add, _ = timed(add)
+            manager.repo.save_all([])
+            t_bulk, _ = timed(manager.repo.append_many, records)
+            t_id, _ = timed(lambda: [manager.search_by_id(rid) for rid in lookups])
+            t_name, found = timed(lambda: [manager.search_by_name(q, prefix)
+                                           for q in SEARCH_QUERIES for prefix in (False, True)])
+            t_del, _ = timed(lambda: [manager.delete_record(str(rid)) for rid in deletes])
+            assert len(manager.get_all_records()) == args.records - args.deletes, name
+            if hasattr(manager.repo, "close"):
+                manager.repo.close()
+        print(f"  {name:<24} {args.records / t_add:>9,.0f} {args.records / t_bulk:>10,.0f} "
+              f"{args.lookups / t_id:>10,.0f} {len(found) / t_name:>9,.1f} {args.deletes / t_del:>9,.0f}")
+
+
+# --------------------------------------------------
+# stress: several processes sharing one records file
+# --------------------------------------------------
+
+STRESS_REPOS = {"csv": "CSVRepository", "cached": "CachedCSVRepository",
+                "journaled": "JournaledCSVRepository"}
+
+
+def stress_worker(repo_name, path, proc, ops, shared_ids, unlocked, seed):
+    """One app instance: random adds/updates/deletes on its own IDs, plus
+    races with the other processes to add the shared IDs."""
+    import random
+    app = load_app()
+    if unlocked:
+        app.fcntl = None
+    rng = random.Random(seed)
+    manager = app.RecordManager(getattr(app, STRESS_REPOS[repo_name])(path))
+    mine, won, counter = {}, [], 0
+    start = time.perf_counter()
+    for op in range(ops):
+        roll = rng.random()
+        if roll < 0.1 and shared_ids:
+            rid = f"shared-{rng.randrange(shared_ids)}"
+            ok, _ = manager.add_record(rid, "Shared", "Tech", "PH", 2025, 1, 1, 1, f"p{proc}")
+            if ok:
+                won.append(rid)
+        elif roll < 0.6 or not mine:
+            rid = f"p{proc}-{counter}"
+            counter += 1
+            ok, _ = manager.add_record(rid, "Analyst", "Tech", "PH", 2025, 1, 1, 1, "v0")
+            mine[rid] = "v0"
+        elif roll < 0.8:
+            rid = rng.choice(list(mine))
+            notes = f"v{op}"
+            manager.repo.update(app.JobRecord(rid, "Analyst", "Tech", "PH", 2025, 1, 1, 1, notes))
+            mine[rid] = notes
+        else:
+            rid = rng.choice(list(mine))
+            manager.delete_record(rid)
+            del mine[rid]
+        if op % 10 == 0:
+            manager.search_by_name("analyst")
+    return mine, won, time.perf_counter() - start
+
+
+def bench_stress(args):
+    import multiprocessing
+    app = load_app()
+    print(f"{args.procs} processes x {args.ops} operations on one {STRESS_REPOS[args.repo]}"
+          f"{' WITHOUT locks' if args.unlocked else ''}\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "custom_records.csv")
+        jobs = [(args.repo, path, p, args.ops, args.shared, args.unlocked, p) for p in range(args.procs)]
+        with multiprocessing.Pool(args.procs) as pool:
+            results = pool.starmap(stress_worker, jobs)
+        elapsed = max(r[2] for r in results)
+
+        expected, winners = {}, {}
+        for mine, won, _ in results:
+            expected.update(mine)
+            for rid in won:
+                winners[rid] = winners.get(rid, 0) + 1
+        final = getattr(app, STRESS_REPOS[args.repo])(path).load_all()
+        notes = {r.rid: r.notes for r in final if not r.rid.startswith("shared-")}
+        shared_rows = [r.rid for r in final if r.rid.startswith("shared-")]
+
+        lost     = [rid for rid in expected if rid not in notes]
+        stale    = [rid for rid in expected if rid in notes and notes[rid] != expected[rid]]
+        ghosts   = [rid for rid in notes if rid not in expected]
+        dup_wins = [rid for rid, n in winners.items() if n > 1]
+        dup_rows = len(shared_rows) - len(set(shared_rows))
+        total = args.procs * args.ops
+        print(f"  {total:,} operations in {elapsed:.2f} s ({total / elapsed:,.0f} ops/s)")
+        print(f"  {len(expected):,} records expected, {len(notes):,} found")
+        print(f"  lost: {len(lost)}  stale updates: {len(stale)}  resurrected deletes: {len(ghosts)}")
+        print(f"  shared IDs added twice: {len(dup_wins)} (duplicate rows: {dup_rows})")
+        if lost or stale or ghosts or dup_wins or dup_rows:
+            print("\nFAILED: concurrent changes were lost or duplicated.")
+            sys.exit(1)
+        print("\nOK: every process's changes survived.")
+
+
+# --------------------------------------------------
+# stream: whole-file analysis vs chunked AggregateCube.from_csv
+# --------------------------------------------------
+
+def bench_stream(args):
+    import pandas as pd
+    source = pd.read_csv(analysis.DATASET_FILE)
+    filters = [(None, None), (2024, None), (None, "Finance"), (2022, "Technology")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dataset.csv")
+        scale_dataset(source, args.rows).to_csv(path, index=False)
+        print(f"{args.rows:,} rows ({os.path.getsize(path) / 2**20:,.0f} MB CSV), "
+              f"peak memory from tracemalloc\n")
+
+        def whole():
+            df = analysis.apply_dataset_schema(pd.read_csv(path))
+            return analysis.AggregateCube(df)
+
+        def chunked():
+            return analysis.AggregateCube.from_csv(path, args.chunksize,
+                                                   prepare=analysis.apply_dataset_schema)
+
+        print(f"  {'Mode':<34} {'Time (s)':>9} {'Peak (MB)':>10}")
+        cubes = {}
+        for name, build in [("read_csv + AggregateCube", whole),
+                            (f"from_csv, chunksize={args.chunksize:,}", chunked)]:
+            elapsed, _, peak, cubes[name] = traced(build)
+            print(f"  {name:<34} {elapsed:>9.2f} {peak / 2**20:>10.1f}")
+
+        a, b = cubes.values()
+        for year, industry in filters:
+            assert json.dumps(analysis.report_to_json(analysis.analyze(a, year, industry))) == \
+                   json.dumps(analysis.report_to_json(analysis.analyze(b, year, industry))), (year, industry)
+        print(f"\nSame report for {len(filters)} Year/Industry filters.")
+
+
+# --------------------------------------------------
+# parallel: AggregateCube in one process vs a shared-memory worker pool
+# --------------------------------------------------
+
+def bench_parallel(args):
+    source = analysis.load_dataset()
+    df = scale_dataset(source, args.rows)
+    filters = analysis.filter_combinations(source)
+
+    print(f"Cube build over {args.rows:,} rows on {os.cpu_count()} CPU(s); "
+          f"the overview and top-jobs chart group-bys are read from the cube\n")
+    print(f"  {'Mode':<22} {'Build (s)':>10} {'Speedup':>8} {'Charts (ms)':>12}")
+
+    def charts(cube):
+        analysis.overview_data(df, cube)
+        analysis.jobs_data(df, cube)
+
+    serial, base = timed(analysis.AggregateCube, df)
+    rescan = timed(charts, None)[0]
+    print(f"  {'in-process':<22} {serial:>10.2f} {1:>7.2f}x {rescan * 1000:>12.1f}  (charts: rescan)")
+    expected = [analysis.report_to_json(analysis.analyze(base, y, i)) for y, i in filters]
+
+    for workers in args.workers:
+        elapsed, cube = timed(analysis.AggregateCube.parallel, df, workers)
+        query = timed(charts, cube)[0]
+        print(f"  {f'{workers} worker(s)':<22} {elapsed:>10.2f} {serial / elapsed:>7.2f}x {query * 1000:>12.1f}")
+        diffs = [d for (y, i), want in zip(filters, expected)
+                 for d in report_differences(want, analysis.report_to_json(analysis.analyze(cube, y, i)))]
+        assert not diffs, (workers, diffs[:5])
+    print(f"\nSame report (within {REPORT_TOLERANCE}) for all {len(filters)} Year/Industry filters "
+          f"at every worker count.")
+
+
+# --------------------------------------------------
+# render: Overview/Salary charts, every point vs level of detail
+# --------------------------------------------------
+
+def render_chart(name, df, cube):
+    # Data + draw + rasterize, as the app's canvas would.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = analysis.render_chart(name, df, cube)
+    FigureCanvasAgg(fig).draw()
+
+
+def bench_render(args):
+    import matplotlib
+    matplotlib.use("Agg")
+    source = analysis.load_dataset()
+    threshold = analysis.LOD_POINTS
+
+    # The salary histogram is always drawn from pre-binned counts, so
+    # only the Overview scatter has an every-point mode to compare.
+    print(f"Chart data + draw + Agg raster (group-bys from the cube), "
+          f"LOD above {threshold:,} rows\n")
+    print(f"  {'Rows':>10} {'Overview, all points (s)':>25} {'Overview, LOD (s)':>18} {'Salary (s)':>11}")
+    for n in args.sizes:
+        df = scale_dataset(source, n)
+        cube = analysis.AggregateCube(df)
+        full = "skipped"
+        if n <= args.max_full:
+            analysis.LOD_POINTS = float("inf")
+            full = f"{timed(render_chart, 'Overview', df, cube)[0]:.2f}"
+            analysis.LOD_POINTS = threshold
+        lod    = timed(render_chart, "Overview", df, cube)[0]
+        salary = timed(render_chart, "Salary Before vs After", df, cube)[0]
+        note = "  (not above LOD_POINTS: both draw every point)" if n <= threshold else ""
+        print(f"  {n:>10,} {full:>25} {lod:>18.2f} {salary:>11.2f}{note}")
+
+
+# --------------------------------------------------
+# incremental: My Records changes, rebuild the cube vs add_row/remove_row/add_rows
+# --------------------------------------------------
+
+def bench_incremental(args):
+    import pandas as pd
+    df = scale_dataset(analysis.load_dataset(), args.rows)
+    cube_cols = analysis.AggregateCube.KEYS + analysis.AggregateCube.MEAN_COLS
+    changes = [{c: (v.item() if hasattr(v, "item") else v) for c, v in zip(cube_cols, row)}
+               for row in df[cube_cols].sample(args.changes, random_state=1).itertuples(index=False)]
+    added = pd.DataFrame(changes).astype(df[cube_cols].dtypes.to_dict())
+
+    print(f"{args.changes:,} added records on top of {args.rows:,} dataset rows\n")
+    rebuild, full = timed(analysis.AggregateCube, pd.concat([df[cube_cols], added], ignore_index=True))
+    print(f"  {'Rebuild the cube once':<34} {rebuild * 1000:>10.1f} ms")
+
+    cube = analysis.AggregateCube(df[cube_cols])
+    elapsed = timed(lambda: [cube.add_row(row) for row in changes])[0]
+    print(f"  {'add_row, per record':<34} {elapsed / len(changes) * 1000:>10.3f} ms")
+    filters = analysis.filter_combinations(df)
+    for year, industry in filters:
+        assert json.dumps(analysis.report_to_json(analysis.analyze(full, year, industry))) == \
+               json.dumps(analysis.report_to_json(analysis.analyze(cube, year, industry))), (year, industry)
+
+    elapsed = timed(lambda: [cube.remove_row(row) for row in changes])[0]
+    print(f"  {'remove_row, per record':<34} {elapsed / len(changes) * 1000:>10.3f} ms")
+
+    elapsed = timed(cube.add_rows, changes)[0]
+    print(f"  {'add_rows, all at once':<34} {elapsed * 1000:>10.1f} ms")
+    for year, industry in filters:
+        assert json.dumps(analysis.report_to_json(analysis.analyze(full, year, industry))) == \
+               json.dumps(analysis.report_to_json(analysis.analyze(cube, year, industry))), (year, industry)
+    print(f"\nSame report as the rebuilt cube for all {len(filters)} Year/Industry filters.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("journal", help="deletes: full rewrite vs append-only journal")
+    p.add_argument("--rows", type=int, default=15000)
+    p.add_argument("--deletes", type=int, default=10000)
+    p.add_argument("--threshold", type=int, default=500, help="journal compaction threshold")
+    p.add_argument("--include-uncached", action="store_true",
+                   help="also time the original re-read + rewrite CSVRepository (slow)")
+    p.set_defaults(func=bench_journal)
+
+    p = sub.add_parser("cube", help="analysis latency: raw rescan vs aggregate cube")
+    p.add_argument("--sizes", type=int, nargs="+", default=[15000, 150000, 1500000])
+    p.set_defaults(func=bench_cube)
+
+    p = sub.add_parser("startup", help="dataset load time: cold vs warm columnar cache")
+    p.add_argument("--sizes", type=int, nargs="+", default=[15000, 150000, 1500000])
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("schema", help="memory report for the load schema + output check")
+    p.set_defaults(func=bench_schema)
+
+    p = sub.add_parser("search", help="search_by_name: linear scan vs n-gram index")
+    p.add_argument("--records", type=int, default=1000000)
+    p.set_defaults(func=bench_search)
+
+    p = sub.add_parser("import", help="bulk import: add_record per row vs import_csv")
+    p.add_argument("--rows", type=int, default=50000)
+    p.add_argument("--include-uncached", action="store_true",
+                   help="also time add_record on the plain CSVRepository (quadratic, very slow)")
+    p.set_defaults(func=bench_import)
+
+    p = sub.add_parser("memory", help="tracemalloc: record objects vs column-oriented RecordTable")
+    p.add_argument("--rows", type=int, default=200000)
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("backends", help="add/search/delete throughput: CSV vs SQLite")
+    p.add_argument("--records", type=int, default=20000)
+    p.add_argument("--lookups", type=int, default=2000)
+    p.add_argument("--deletes", type=int, default=2000)
+    p.add_argument("--include-uncached", action="store_true",
+                   help="also time the original re-read + rewrite CSVRepository (slow)")
+    p.set_defaults(func=bench_backends)
+
+    p = sub.add_parser("stress", help="multi-process adds/updates/deletes on one shared file")
+    p.add_argument("--procs", type=int, default=4)
+    p.add_argument("--ops", type=int, default=500, help="operations per process")
+    p.add_argument("--shared", type=int, default=50, help="IDs all processes race to add")
+    p.add_argument("--repo", choices=sorted(STRESS_REPOS), default="journaled")
+    p.add_argument("--unlocked", action="store_true",
+                   help="disable the file locks, to show what goes wrong without them")
+    p.set_defaults(func=bench_stress)
+
+    p = sub.add_parser("stream", help="analysis memory: whole file vs chunked cube")
+    p.add_argument("--rows", type=int, default=1000000)
+    p.add_argument("--chunksize", type=int, default=200000)
+    p.set_defaults(func=bench_stream)
+
+    p = sub.add_parser("parallel", help="cube build: one process vs shared-memory worker pool")
+    p.add_argument("--rows", type=int, default=4000000)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.set_defaults(func=bench_parallel)
+
+    p = sub.add_parser("render", help="chart render time: every point vs level of detail")
+    p.add_argument("--sizes", type=int, nargs="+", default=[15000, 1000000, 3000000],
+                   help="row counts; sizes above LOD_POINTS show the density image's flat cost")
+    p.add_argument("--max-full", type=int, default=3000000,
+                   help="largest size to also draw with every point")
+    p.set_defaults(func=bench_render)
+
+    p = sub.add_parser("incremental", help="My Records changes: cube rebuild vs add_row/remove_row")
+    p.add_argument("--rows", type=int, default=1500000)
+    p.add_argument("--changes", type=int, default=1000)
+    p.set_defaults(func=bench_incremental)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
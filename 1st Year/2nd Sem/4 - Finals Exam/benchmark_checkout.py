@@ -0,0 +1,116 @@
+"""
+Checkout throughput with several terminals selling from the same stock.
+
+Compares the old checkout (read all products, check stock in Python, one
+update_stock per line, then add_sale, each its own commit) with
+DatabaseManager.checkout (one transaction, conditional UPDATE). Runs on
+the SQLite stand-in by default, or on a MySQL database with --mysql NAME
+(use a scratch database: its products and sales are replaced).
+
+    python benchmark_checkout.py
+    python benchmark_checkout.py --terminals 8 --orders 300 --stock 100
+    python benchmark_checkout.py --mysql cafe_bench
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+from database import DatabaseManager, OutOfStockError, SQLitePool
+
+PRODUCTS = 20
+
+
+def now():
+    # A string works as a DATETIME on both MySQL and SQLite.
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def legacy_checkout(db, cart):
+    """What MainApp.checkout did before DatabaseManager.checkout existed."""
+    items_in_db = {item[0]: item for item in db.fetch_menu_items()}
+    for pid, qty in cart.items():
+        if qty > items_in_db[pid][3]:
+            return False
+    for pid, qty in cart.items():
+        db.update_stock(pid, -qty)
+    db.add_sale(now(), [(pid, qty, 100) for pid, qty in cart.items()], 100)
+    return True
+
+
+def atomic_checkout(db, cart):
+    try:
+        db.checkout([(pid, qty, 100) for pid, qty in cart.items()], now(), 100)
+    except OutOfStockError:
+        return False
+    return True
+
+
+def reset(db, stock):
+    db.execute_query("DELETE FROM sale_items")
+    db.execute_query("DELETE FROM sales")
+    db.execute_query("DELETE FROM products")
+    for pid in range(1, PRODUCTS + 1):
+        db.execute_query("INSERT INTO products (id, name, price, stock, category_id) "
+                         "VALUES (%s, %s, %s, %s, %s)", (pid, f"Product {pid}", 100, stock, 1))
+
+
+def run(db, checkout, args):
+    reset(db, args.stock)
+    sold = [0] * args.terminals     # units, per terminal
+    completed = [0] * args.terminals
+
+    def terminal(t):
+        rng = random.Random(t)
+        for _ in range(args.orders):
+            cart = {pid: rng.randint(1, 3)
+                    for pid in rng.sample(range(1, PRODUCTS + 1), rng.randint(1, 4))}
+            if checkout(db, cart):
+                completed[t] += 1
+                sold[t] += sum(cart.values())
+
+    threads = [threading.Thread(target=terminal, args=(t,)) for t in range(args.terminals)]
+    start = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.perf_counter() - start
+
+    stock = db.fetch_stock(range(1, PRODUCTS + 1))
+    assert sum(sold) == PRODUCTS * args.stock - sum(stock.values())
+    oversold = sum(-s for s in stock.values() if s < 0)
+    return elapsed, sum(completed), oversold, sum(1 for s in stock.values() if s < 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terminals", type=int, default=4)
+    parser.add_argument("--orders", type=int, default=200, help="checkouts per terminal")
+    parser.add_argument("--stock", type=int, default=60, help="starting stock of each product")
+    parser.add_argument("--mysql", metavar="DATABASE", help="run on this MySQL database instead of SQLite")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.mysql:
+            db = DatabaseManager({"database": args.mysql}, pool_size=args.terminals)
+        else:
+            db = DatabaseManager(pool=SQLitePool(os.path.join(tmp, "pos.db"), args.terminals))
+
+        print(f"{args.terminals} terminals x {args.orders} checkouts, "
+              f"{PRODUCTS} products with {args.stock} in stock each\n")
+        print(f"  {'Checkout':<22} {'Time (s)':>9} {'Sales/s':>9} {'Completed':>10} "
+              f"{'Oversold':>9} {'Stock < 0':>10}")
+        for name, checkout in [("per-line commits", legacy_checkout),
+                               ("one transaction", atomic_checkout)]:
+            elapsed, completed, oversold, negative = run(db, checkout, args)
+            print(f"  {name:<22} {elapsed:>9.2f} {completed / elapsed:>9.0f} {completed:>10,} "
+                  f"{oversold:>9,} {negative:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,409 @@
+import re
+import time
+import queue
+import sqlite3
+from contextlib import contextmanager
+
 import mysql.connector
+from mysql.connector import pooling, errorcode
 from tkinter import messagebox
 
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "root",
+    "database": "cafe_management",
+}
+
+# One pooled connection per concurrent operation. Checkout waits up to
+# POOL_TIMEOUT seconds for a free one; a connection that went stale while
+# idle (e.g. MySQL's wait_timeout) is pinged and reconnected before use.
+POOL_SIZE          = 5
+POOL_TIMEOUT       = 10
+RECONNECT_ATTEMPTS = 3
+RECONNECT_DELAY    = 1
+
+# Sales per page in Transaction Records (see fetch_sales_page).
+SALES_PAGE_SIZE    = 25
+
+
+# One line of the old sales.items text, e.g. "2x Americano" in
+# "2x Americano, 1x Cortado".
+LEGACY_ITEM = re.compile(r"(\d+)x (.+)")
+
+
+def parse_items(text):
+    """[(qty, product name), ...] from an old sales.items text."""
+    lines = []
+    for part in re.split(r", (?=\d+x )", text.strip()):
+        match = LEGACY_ITEM.fullmatch(part.strip())
+        if match:
+            lines.append((int(match.group(1)), match.group(2)))
+    return lines
+
+
+class OutOfStockError(Exception):
+    """A checkout asked for more than is in stock. Nothing was changed."""
+
+    def __init__(self, shortages):
+        # {product_id: (requested, available)}
+        self.shortages = shortages
+        super().__init__(", ".join(f"product {pid}: requested {want}, available {have}"
+                                   for pid, (want, have) in shortages.items()))
+
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, config=None, pool_size=POOL_SIZE, create_schema=True, pool=None):
+        """Opens the connection pool.
+
+        Pass create_schema=False to skip the CREATE TABLE statements at
+        startup, e.g. when sqldata.sql has already been run in Workbench.
+        pool replaces the MySQL pool, e.g. with a SQLitePool for tests.
+        """
+        self.pool = pool
         try:
-            self.db = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="root",
-                database="cafe_management"
-            )
-            self.cursor = self.db.cursor()
-            # We don't need create_tables() here if you ran the SQL script in Workbench,
-            # but keeping it safe and updated to 'products'
-            self.create_tables()
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name="bean_and_brew",
+                    pool_size=pool_size,
+                    pool_reset_session=True,
+                    **{**DB_CONFIG, **(config or {})}
+                )
+            if create_schema:
+                self.create_tables()
         except mysql.connector.Error as err:
             messagebox.showerror("Connection Error", f"Could not connect to MySQL: {err}")
 
+    @contextmanager
+    def connection(self):
+        """Checks a live connection out of the pool for one operation."""
+        if self.pool is None:
+            raise mysql.connector.InterfaceError("Not connected to MySQL")
+        deadline = time.monotonic() + POOL_TIMEOUT
+        while True:
+            try:
+                conn = self.pool.get_connection()
+                break
+            except mysql.connector.errors.PoolError:
+                # Every connection is busy on another operation.
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+        try:
+            conn.ping(reconnect=True, attempts=RECONNECT_ATTEMPTS, delay=RECONNECT_DELAY)
+            yield conn
+        finally:
+            conn.close()    # back to the pool
+
+    @contextmanager
+    def transaction(self):
+        """Yields a cursor; commits when the block ends, rolls back if it raises."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
     def create_tables(self):
         """Ensures the required tables exist using names that match the POS code."""
-        # Table for products (Matches image_560083.png requirement)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(255) NOT NULL,
-                price DECIMAL(10, 2) NOT NULL,
-                stock INT DEFAULT 0,
-                category_id INT
-            )
-        """)
-        
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sales (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                date VARCHAR(255) NOT NULL,
-                items TEXT NOT NULL,
-                total DECIMAL(10, 2) NOT NULL
-            )
-        """)
-        self.db.commit()
+        with self.transaction() as cursor:
+            # Table for products (Matches image_560083.png requirement)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    price DECIMAL(10, 2) NOT NULL,
+                    stock INT DEFAULT 0,
+                    category_id INT
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sales (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    date DATETIME NOT NULL,
+                    total DECIMAL(10, 2) NOT NULL
+                )
+            """)
+            self._create_index(cursor, "idx_sales_date", "sales", "date")
+
+            # One row per product in a sale, at the price it was sold for
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sale_items (
+                    sale_id INT NOT NULL,
+                    product_id INT NOT NULL,
+                    qty INT NOT NULL,
+                    unit_price DECIMAL(10, 2) NOT NULL,
+                    PRIMARY KEY (sale_id, product_id),
+                    FOREIGN KEY (sale_id) REFERENCES sales(id) ON DELETE CASCADE
+                )
+            """)
+            self._create_index(cursor, "idx_sale_items_product", "sale_items", "product_id")
+
+    @staticmethod
+    def _create_index(cursor, name, table, columns):
+        # MySQL has no CREATE INDEX IF NOT EXISTS
+        try:
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        except mysql.connector.Error as err:
+            if err.errno != errorcode.ER_DUP_KEYNAME:
+                raise
 
     def fetch_menu_items(self):
         """Retrieves all products. Updated to query 'products' table."""
-        self.cursor.execute("SELECT * FROM products")
-        return self.cursor.fetchall()
+        with self.transaction() as cursor:
+            cursor.execute("SELECT * FROM products")
+            return cursor.fetchall()
 
-    def fetch_sales(self):
-        self.cursor.execute("SELECT * FROM sales ORDER BY id DESC")
-        return self.cursor.fetchall()
+    def fetch_sales_page(self, before_id=None, limit=SALES_PAGE_SIZE):
+        """[(id, date, "2x Americano, 1x Cortado", total), ...], newest first:
+        the `limit` sales with id < before_id (the newest ones when it is None).
+
+        Pass the id of the last sale of one page to get the next; the seek on
+        the primary key costs the same on page 1 and page 1,000.
+        """
+        with self.transaction() as cursor:
+            if before_id is None:
+                cursor.execute("SELECT id, date, total FROM sales ORDER BY id DESC LIMIT %s", (limit,))
+            else:
+                cursor.execute("SELECT id, date, total FROM sales WHERE id < %s "
+                               "ORDER BY id DESC LIMIT %s", (before_id, limit))
+            sales = cursor.fetchall()
+            summaries = self._item_summaries(cursor, [sale[0] for sale in sales])
+        return [(sid, date, summaries.get(sid, ""), total) for sid, date, total in sales]
+
+    @staticmethod
+    def _item_summaries(cursor, sale_ids):
+        if not sale_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(sale_ids))
+        cursor.execute(f"""
+            SELECT i.sale_id, i.qty, COALESCE(p.name, 'Deleted product')
+            FROM sale_items i LEFT JOIN products p ON p.id = i.product_id
+            WHERE i.sale_id IN ({placeholders})
+        """, list(sale_ids))
+        lines = {}
+        for sid, qty, name in cursor.fetchall():
+            lines.setdefault(sid, []).append(f"{qty}x {name}")
+        return {sid: ", ".join(items) for sid, items in lines.items()}
+
+    def sales_by_product(self, start, end):
+        """[(product id, name, units, revenue), ...] sold from start up to end, best sellers first."""
+        with self.transaction() as cursor:
+            cursor.execute("""
+                SELECT i.product_id, COALESCE(p.name, 'Deleted product'),
+                       SUM(i.qty), SUM(i.qty * i.unit_price) AS revenue
+                FROM sales s
+                JOIN sale_items i ON i.sale_id = s.id
+                LEFT JOIN products p ON p.id = i.product_id
+                WHERE s.date >= %s AND s.date < %s
+                GROUP BY i.product_id, p.name
+                ORDER BY revenue DESC
+            """, (start, end))
+            return cursor.fetchall()
+
+    def sales_by_day(self, start, end):
+        """[(day, number of sales, total), ...] from start up to end."""
+        with self.transaction() as cursor:
+            cursor.execute("""
+                SELECT DATE(date) AS day, COUNT(*), SUM(total)
+                FROM sales
+                WHERE date >= %s AND date < %s
+                GROUP BY DATE(date)
+                ORDER BY day
+            """, (start, end))
+            return cursor.fetchall()
 
     def update_stock(self, product_id, change):
         """Fixed query to use 'id' instead of 'product_id' to match schema."""
         query = "UPDATE products SET stock = stock + %s WHERE id = %s"
-        self.cursor.execute(query, (change, product_id))
-        self.db.commit()
+        with self.transaction() as cursor:
+            cursor.execute(query, (change, product_id))
+
+    def add_sale(self, date, lines, total):
+        """Records a sale without touching stock; lines is [(product_id, qty, unit_price), ...]."""
+        with self.transaction() as cursor:
+            return self._insert_sale(cursor, date, lines, total)
+
+    @staticmethod
+    def _insert_sale(cursor, date, lines, total):
+        cursor.execute("INSERT INTO sales (date, total) VALUES (%s, %s)", (date, total))
+        sale_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO sale_items (sale_id, product_id, qty, unit_price) VALUES (%s, %s, %s, %s)",
+            [(sale_id, pid, qty, price) for pid, qty, price in lines])
+        return sale_id
+
+    def checkout(self, lines, date, total):
+        """Takes a sale's items out of stock and records the sale, in one transaction.
 
-    def add_sale(self, date, items, total):
+        lines is [(product_id, qty, unit_price), ...]. A stock row is only updated if it
+        still holds enough (stock >= qty), so two terminals can't both sell
+        the last few of an item. If any line falls short, nothing changes
+        and OutOfStockError says which. Returns the new sale's id.
+        """
+        wanted, prices = {}, {}
+        for pid, qty, price in lines:
+            if qty > 0:
+                wanted[pid] = wanted.get(pid, 0) + qty
+                prices[pid] = price
+        # Rows are locked in id order on every terminal, so two checkouts
+        # can't deadlock waiting on each other's rows.
+        params = [(qty, pid, qty) for pid, qty in sorted(wanted.items())]
         try:
-            query = "INSERT INTO sales (date, items, total) VALUES (%s, %s, %s)"
-            values = (date, items, total)
-            self.cursor.execute(query, values)
-            self.db.commit()
-        except mysql.connector.Error as err:
-            self.db.rollback()
-            raise err
+            with self.transaction() as cursor:
+                cursor.executemany(
+                    "UPDATE products SET stock = stock - %s WHERE id = %s AND stock >= %s", params)
+                if cursor.rowcount != len(params):
+                    raise OutOfStockError({})
+                return self._insert_sale(cursor, date,
+                                         [(pid, qty, prices[pid]) for pid, qty in wanted.items()], total)
+        except OutOfStockError:
+            # Rolled back; look up what is actually left to explain why.
+            stock = self.fetch_stock(list(wanted))
+            raise OutOfStockError({pid: (qty, stock.get(pid, 0)) for pid, qty in wanted.items()
+                                   if stock.get(pid, 0) < qty}) from None
+
+    def fetch_stock(self, product_ids):
+        """{product_id: stock} for the given products."""
+        if not product_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        with self.transaction() as cursor:
+            cursor.execute(f"SELECT id, stock FROM products WHERE id IN ({placeholders})",
+                           list(product_ids))
+            return dict(cursor.fetchall())
 
     def execute_query(self, query, params=None):
         """Helper for the Edit and Delete functions in MainApp."""
-        self.cursor.execute(query, params or ())
-        self.db.commit()
+        with self.transaction() as cursor:
+            cursor.execute(query, params or ())
+
+    def migrate_sales(self):
+        """One-time upgrade (MySQL) of a database made by the old sqldata.sql.
+
+        Parses each sale's items text into sale_items rows, priced at the
+        product's current price (the text never had prices), and turns
+        sales.date into an indexed DATETIME. sales.items is dropped once
+        every line has been matched to a product; lines naming products
+        that no longer exist are returned as [(sale_id, name), ...] and
+        the column is kept so nothing is lost, made nullable so new sales
+        (which have no items text) can still be inserted.
+        """
+        self.create_tables()    # sale_items
+        unmatched = []
+        with self.transaction() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sales' AND COLUMN_NAME = 'items'
+            """)
+            if not cursor.fetchone()[0]:
+                return unmatched    # already migrated
+
+            cursor.execute("SELECT name, id, price FROM products")
+            products = {name: (pid, price) for name, pid, price in cursor.fetchall()}
+            cursor.execute("""
+                SELECT id, items FROM sales
+                WHERE items IS NOT NULL AND id NOT IN (SELECT sale_id FROM sale_items)
+            """)
+            rows = {}
+            for sale_id, text in cursor.fetchall():
+                for qty, name in parse_items(text):
+                    if name not in products:
+                        unmatched.append((sale_id, name))
+                        continue
+                    pid, price = products[name]
+                    old = rows.get((sale_id, pid), (0,))[0]
+                    rows[(sale_id, pid)] = (old + qty, price)
+            cursor.executemany(
+                "INSERT INTO sale_items (sale_id, product_id, qty, unit_price) VALUES (%s, %s, %s, %s)",
+                [(sid, pid, qty, price) for (sid, pid), (qty, price) in rows.items()])
+
+        # DDL commits on its own in MySQL, so it runs after the data is in.
+        with self.transaction() as cursor:
+            cursor.execute("ALTER TABLE sales MODIFY date DATETIME NOT NULL")
+            self._create_index(cursor, "idx_sales_date", "sales", "date")
+            if not unmatched:
+                cursor.execute("ALTER TABLE sales DROP COLUMN items")
+            else:
+                cursor.execute("ALTER TABLE sales MODIFY items TEXT NULL")
+        return unmatched
+
+
+# ============================================================
+# SQLite stand-in for the MySQL pool (tests and benchmarks)
+# ============================================================
+
+# The queries are written for MySQL; these rewrites make them run on SQLite.
+MYSQL_TO_SQLITE = [
+    ("INT AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    ("CREATE INDEX", "CREATE INDEX IF NOT EXISTS"),
+    ("%s", "?"),
+]
+
+
+def to_sqlite(query):
+    for mysql_text, sqlite_text in MYSQL_TO_SQLITE:
+        query = query.replace(mysql_text, sqlite_text)
+    return query
+
+
+class _SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        return self._cursor.execute(to_sqlite(query), params)
+
+    def executemany(self, query, seq_of_params):
+        return self._cursor.executemany(to_sqlite(query), seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _SQLiteConnection:
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def cursor(self):
+        return _SQLiteCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, **kwargs):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._pool.release(self._conn)
+
+
+class SQLitePool:
+    """Works like MySQLConnectionPool over a local SQLite file, so
+    DatabaseManager can run without a MySQL server: DatabaseManager(pool=SQLitePool(path))."""
+
+    def __init__(self, path, pool_size=POOL_SIZE):
+        self._idle = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(path, timeout=POOL_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._idle.put(conn)
+
+    def get_connection(self):
+        try:
+            return _SQLiteConnection(self, self._idle.get_nowait())
+        except queue.Empty:
+            raise mysql.connector.errors.PoolError("Failed getting connection; pool exhausted") from None
 
-    def __del__(self):
-        if hasattr(self, 'db') and self.db.is_connected():
-            self.cursor.close()
-            self.db.close()
\ No newline at end of file
+    def release(self, conn):
+        self._idle.put(conn)
@@ -1,10 +1,35 @@
+import argparse
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog
 from datetime import datetime
-from database import DatabaseManager
+from decimal import Decimal
+from database import DatabaseManager, OutOfStockError, SALES_PAGE_SIZE
+
+class SalePill:
+    """One order in Transaction Records. Pills are recycled: show() refills one with another sale."""
+    def __init__(self, app, master):
+        self.frame = ctk.CTkFrame(master, fg_color="white", corner_radius=15, border_width=app.b_width, border_color=app.border_gray)
+        head = ctk.CTkFrame(self.frame, fg_color="#F8F8F8", height=40)
+        head.pack(fill="x", padx=2, pady=2)
+        self.order_lbl = ctk.CTkLabel(head, text="", font=("SF Pro", 12, "bold"))
+        self.order_lbl.pack(side="left", padx=15)
+        self.date_lbl = ctk.CTkLabel(head, text="", font=("SF Pro", 11), text_color="gray")
+        self.date_lbl.pack(side="right", padx=15)
+        self.items_lbl = ctk.CTkLabel(self.frame, text="", font=("SF Pro", 14), wraplength=550, justify="left")
+        self.items_lbl.pack(anchor="w", padx=20, pady=10)
+        self.total_lbl = ctk.CTkLabel(self.frame, text="", font=("SF Pro", 18, "bold"), text_color=app.primary_green)
+        self.total_lbl.pack(anchor="e", padx=20, pady=(0, 10))
+
+    def show(self, sale, before=None):
+        self.order_lbl.configure(text=f"Order #{sale[0]}")
+        self.date_lbl.configure(text=sale[1].strftime("%Y-%m-%d %H:%M"))
+        self.items_lbl.configure(text=sale[2])
+        self.total_lbl.configure(text=f"Total: ₱{sale[3]:,.2f}")
+        if before: self.frame.pack(fill="x", padx=10, pady=8, before=before)
+        else: self.frame.pack(fill="x", padx=10, pady=8)
 
 class MainApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, create_schema=True):
         super().__init__()
         
         # Window Configuration & Scaling
@@ -16,15 +41,16 @@ class MainApp(ctk.CTk):
         self.primary_green = "#276C4C"
         self.bg_gray = "#EEEEEE"
         self.border_gray = "#D1D1D6"
-        self.tax_rate = 0.12 
+        self.tax_rate = Decimal("0.12")
         self.b_width = 3 # Global Border Width requirement
         
         ctk.set_appearance_mode("light")
         self.configure(fg_color=self.bg_gray)
         
         # Data & State Management
-        self.db = DatabaseManager()
-        self.cart = {} 
+        self.db = DatabaseManager(create_schema=create_schema)
+        self.cart = {} # name -> {'price': Decimal, 'qty', 'id', 'row', 'qty_lbl'}
+        self.subtotal = Decimal("0") # Kept up to date by update_cart and delete_from_cart
         self.nav_btns = {}
         self.categories = {
             1: "Espresso Drinks", 
@@ -35,6 +61,25 @@ class MainApp(ctk.CTk):
         }
         self.expanded_categories = {cat_id: False for cat_id in self.categories.keys()}
         self.current_filter = "All"
+        self.kept_views = set() # Container children that clear_view hides instead of destroying
+
+        # Dashboard: products are loaded into self.catalog once and again only after
+        # stock or price changes; each gets one card, created on first display.
+        self.dash_view = None
+        self.dash_sections = {} # cat_id -> (section frame, card grid)
+        self.cards = {} # pid -> {"frame", "stock", "name", "price", "btn", "item", "pos"}
+        self.search_after = None
+        self.search_delay_ms = 200
+        self.refresh_catalog()
+
+        # Transaction Records: pages of sales, newest first. Only pages near the
+        # viewport have pills; the rest keep their place with an empty spacer.
+        self.sales_list = None
+        self.sales_pages = [] # [{"rows": [...], "pills": [SalePill] or None, "spacer": CTkFrame or None}]
+        self.free_pills = []
+        self.sales_done = False
+        self.sales_watch = None
+        self.scroll_poll_ms = 150
 
         # Main Layout Configuration
         self.grid_columnconfigure(0, weight=0, minsize=260) 
@@ -118,19 +163,29 @@ class MainApp(ctk.CTk):
     def show_dashboard(self, filter_text=""):
         self.clear_view()
         self.update_nav("Dashboard")
+        if self.dash_view is None: self.build_dashboard()
+        self.dash_view.pack(fill="x")
         
-        h = ctk.CTkFrame(self.container, fg_color="transparent")
+        self.dash_search.delete(0, "end")
+        if filter_text: self.dash_search.insert(0, filter_text)
+        self.filter_dashboard()
+
+    def build_dashboard(self):
+        """Builds the dashboard once; afterwards it is hidden and shown by clear_view and show_dashboard."""
+        self.dash_view = ctk.CTkFrame(self.container, fg_color="transparent")
+        self.kept_views.add(self.dash_view)
+        
+        h = ctk.CTkFrame(self.dash_view, fg_color="transparent")
         h.pack(fill="x", pady=(10, 25), padx=10)
         ctk.CTkLabel(h, text="Welcome back, Admin! 👋", font=("SF Pro Emoji", 25), text_color="gray").pack(anchor="w")
         ctk.CTkLabel(h, text="Menu Dashboard", font=("SF Pro Display", 67, "bold")).pack(anchor="w")
         
-        row_search = ctk.CTkFrame(self.container, fg_color="transparent")
+        row_search = ctk.CTkFrame(self.dash_view, fg_color="transparent")
         row_search.pack(fill="x", padx=10, pady=(0, 20))
         
         self.dash_search = ctk.CTkEntry(row_search, placeholder_text="🔍 Search products...", height=45, corner_radius=12, border_width=self.b_width)
         self.dash_search.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        if filter_text: self.dash_search.insert(0, filter_text)
-        self.dash_search.bind("<KeyRelease>", lambda e: self.show_dashboard(self.dash_search.get()))
+        self.dash_search.bind("<KeyRelease>", lambda e: self.schedule_dashboard_filter())
 
         ctk.CTkButton(
             row_search, text="▽", width=45, height=45, corner_radius=12, 
@@ -138,32 +193,94 @@ class MainApp(ctk.CTk):
             text_color="black", command=self.open_filter_menu
         ).pack(side="right")
 
-        items = self.db.fetch_menu_items()
-        for cat_id, cat_name in self.categories.items():
-            if self.current_filter != "All" and cat_name != self.current_filter: continue
-            cat_items = [i for i in items if i[4] == cat_id and filter_text.lower() in i[1].lower()]
-            if not cat_items: continue
-            
-            ctk.CTkLabel(self.container, text=f"☕ {cat_name}", font=("SF Pro Display", 20, "bold")).pack(anchor="w", padx=10, pady=(15, 5))
-            grid = ctk.CTkFrame(self.container, fg_color="transparent")
+        # One section per category, gridded in menu order so a hidden one comes back in place
+        body = ctk.CTkFrame(self.dash_view, fg_color="transparent")
+        body.pack(fill="x")
+        body.columnconfigure(0, weight=1)
+        for row, (cat_id, cat_name) in enumerate(self.categories.items()):
+            section = ctk.CTkFrame(body, fg_color="transparent")
+            section.grid(row=row, column=0, sticky="ew")
+            section.grid_remove()
+            ctk.CTkLabel(section, text=f"☕ {cat_name}", font=("SF Pro Display", 20, "bold")).pack(anchor="w", padx=10, pady=(15, 5))
+            grid = ctk.CTkFrame(section, fg_color="transparent")
             grid.pack(fill="x", padx=10)
             grid.columnconfigure((0, 1, 2), weight=1)
+            self.dash_sections[cat_id] = (section, grid)
+
+    def schedule_dashboard_filter(self):
+        """Filters once typing pauses for search_delay_ms instead of on every key."""
+        if self.search_after: self.after_cancel(self.search_after)
+        self.search_after = self.after(self.search_delay_ms, self.filter_dashboard)
+
+    def filter_dashboard(self):
+        """Shows the cached cards that match the search and category filter.
+
+        Pure in-memory: reads self.catalog, and only cards that appear,
+        disappear or move are re-gridded.
+        """
+        self.search_after = None
+        text = self.dash_search.get().lower()
+        for cat_id, cat_name in self.categories.items():
+            section, grid = self.dash_sections[cat_id]
+            shown = []
+            if self.current_filter == "All" or cat_name == self.current_filter:
+                shown = [pid for pid, item in self.catalog.items() if item[4] == cat_id and text in item[1].lower()]
+            
+            for i, pid in enumerate(shown):
+                card = self.cards.get(pid) or self.make_card(self.catalog[pid], grid)
+                if card["pos"] != (i//3, i%3):
+                    card["frame"].grid(row=i//3, column=i%3, padx=8, pady=8, sticky="nsew")
+                    card["pos"] = (i//3, i%3)
+            shown = set(shown)
+            for pid, card in self.cards.items():
+                if card["pos"] and card["item"][4] == cat_id and pid not in shown:
+                    card["frame"].grid_remove()
+                    card["pos"] = None
             
-            for i, item in enumerate(cat_items):
-                card = ctk.CTkFrame(grid, height=230, fg_color="white", corner_radius=15, border_width=self.b_width, border_color=self.border_gray)
-                card.grid(row=i//3, column=i%3, padx=8, pady=8, sticky="nsew")
-                card.grid_propagate(False)
-                
-                stock_color = "#FF3B30" if item[3] <= 5 else "#8E8E93"
-                ctk.CTkLabel(card, text=f"Stock: {item[3]}", font=("SF Pro", 10, "bold"), text_color=stock_color).pack(anchor="e", padx=12, pady=(10, 0))
-                ctk.CTkLabel(card, text=item[1], font=("SF Pro", 16, "bold"), wraplength=140).pack(pady=(10, 2))
-                ctk.CTkLabel(card, text=f"₱{float(item[2]):,.2f}", font=("SF Pro", 14)).pack()
-                
-                ctk.CTkButton(
-                    card, text="Add to Order", height=35, 
-                    fg_color=self.primary_green if item[3] > 0 else "#D1D1D6", 
-                    state="normal" if item[3] > 0 else "disabled", command=lambda n=item[1], p=item[2], i=item[0]: self.update_cart(n, p, 1, i)
-                ).pack(side="bottom", pady=15, padx=15, fill="x")
+            if shown: section.grid()
+            else: section.grid_remove()
+
+    def make_card(self, item, grid):
+        card = ctk.CTkFrame(grid, height=230, fg_color="white", corner_radius=15, border_width=self.b_width, border_color=self.border_gray)
+        card.grid_propagate(False)
+        
+        stock = ctk.CTkLabel(card, text="", font=("SF Pro", 10, "bold"))
+        stock.pack(anchor="e", padx=12, pady=(10, 0))
+        name = ctk.CTkLabel(card, text="", font=("SF Pro", 16, "bold"), wraplength=140)
+        name.pack(pady=(10, 2))
+        price = ctk.CTkLabel(card, text="", font=("SF Pro", 14))
+        price.pack()
+        
+        btn = ctk.CTkButton(
+            card, text="Add to Order", height=35, 
+            command=lambda i=item[0]: self.update_cart(self.catalog[i][1], self.catalog[i][2], 1, i)
+        )
+        btn.pack(side="bottom", pady=15, padx=15, fill="x")
+        
+        self.cards[item[0]] = {"frame": card, "stock": stock, "name": name, "price": price, "btn": btn, "item": None, "pos": None}
+        self.update_card(self.cards[item[0]], item)
+        return self.cards[item[0]]
+
+    def update_card(self, card, item):
+        if card["item"] == item: return
+        stock_color = "#FF3B30" if item[3] <= 5 else "#8E8E93"
+        card["stock"].configure(text=f"Stock: {item[3]}", text_color=stock_color)
+        card["name"].configure(text=item[1])
+        card["price"].configure(text=f"₱{float(item[2]):,.2f}")
+        card["btn"].configure(
+            fg_color=self.primary_green if item[3] > 0 else "#D1D1D6", 
+            state="normal" if item[3] > 0 else "disabled"
+        )
+        card["item"] = item
+
+    def refresh_catalog(self):
+        """Reloads products after a stock or price change and updates only the cards that changed."""
+        self.catalog = {item[0]: item for item in self.db.fetch_menu_items()}
+        # Deleted products, or ones moved to another category (their card sits in the old grid)
+        stale = [pid for pid, card in self.cards.items() if pid not in self.catalog or self.catalog[pid][4] != card["item"][4]]
+        for pid in stale: self.cards.pop(pid)["frame"].destroy()
+        for pid, card in self.cards.items(): self.update_card(card, self.catalog[pid])
+        if self.dash_view is not None: self.filter_dashboard()
 
     def show_inventory_manager(self, filter_text=""):
         self.clear_view()
@@ -175,7 +292,7 @@ class MainApp(ctk.CTk):
         if filter_text: self.inv_search.insert(0, filter_text)
         self.inv_search.bind("<KeyRelease>", lambda e: self.show_inventory_manager(self.inv_search.get()))
 
-        items = self.db.fetch_menu_items()
+        items = list(self.catalog.values())
         for cat_id, cat_name in self.categories.items():
             cat_items = [i for i in items if i[4] == cat_id and filter_text.lower() in i[1].lower()]
             if not cat_items: continue
@@ -209,46 +326,109 @@ class MainApp(ctk.CTk):
         self.update_nav("Transaction Records")
         ctk.CTkLabel(self.container, text="Transaction History", font=("SF Pro Display", 38, "bold")).pack(anchor="w", padx=10, pady=(10, 25))
         
-        sales = self.db.fetch_sales()
-        for sale in sales:
-            pill = ctk.CTkFrame(self.container, fg_color="white", corner_radius=15, border_width=self.b_width, border_color=self.border_gray)
-            pill.pack(fill="x", padx=10, pady=8)
-            head = ctk.CTkFrame(pill, fg_color="#F8F8F8", height=40)
-            head.pack(fill="x", padx=2, pady=2)
-            ctk.CTkLabel(head, text=f"Order #{sale[0]}", font=("SF Pro", 12, "bold")).pack(side="left", padx=15)
-            ctk.CTkLabel(head, text=sale[1], font=("SF Pro", 11), text_color="gray").pack(side="right", padx=15)
-            ctk.CTkLabel(pill, text=sale[2], font=("SF Pro", 14), wraplength=550, justify="left").pack(anchor="w", padx=20, pady=10)
-            ctk.CTkLabel(pill, text=f"Total: ₱{sale[3]:,.2f}", font=("SF Pro", 18, "bold"), text_color=self.primary_green).pack(anchor="e", padx=20, pady=(0, 10))
-
-    def render_cart(self):
-        for widget in self.cart_scroll.winfo_children(): widget.destroy()
-        subtotal = 0.0
-        for name, data in self.cart.items():
-            row = ctk.CTkFrame(self.cart_scroll, fg_color="#F8F8F8", corner_radius=12, border_width=self.b_width, border_color="#E5E5E5")
-            row.pack(fill="x", pady=4, padx=5)
-            ctk.CTkButton(row, text="🗑️", width=30, height=30, fg_color="transparent", text_color="#FF3B30", command=lambda n=name: self.delete_from_cart(n)).pack(side="left", padx=8)
-            
-            info = ctk.CTkFrame(row, fg_color="transparent")
-            info.pack(side="left", fill="both", expand=True, padx=5, pady=8)
-            ctk.CTkLabel(info, text=name, font=("SF Pro", 12, "bold"), anchor="w").pack(fill="x")
-            ctk.CTkLabel(info, text=f"₱{data['price']:,.2f}", font=("SF Pro", 11), text_color=self.primary_green, anchor="w").pack(fill="x")
-            
-            ctrl = ctk.CTkFrame(row, fg_color="white", corner_radius=6)
-            ctrl.pack(side="right", padx=8)
-            ctk.CTkButton(ctrl, text="−", width=24, height=24, fg_color=self.primary_green, command=lambda n=name, p=data['price'], i=data['id']: self.update_cart(n, p, -1, i)).pack(side="left")
-            ctk.CTkLabel(ctrl, text=str(data['qty']), font=("SF Pro", 11, "bold"), width=22).pack(side="left")
-            ctk.CTkButton(ctrl, text="+", width=24, height=24, fg_color=self.primary_green, command=lambda n=name, p=data['price'], i=data['id']: self.update_cart(n, p, 1, i)).pack(side="left")
-            subtotal += data['price'] * data['qty']
+        if self.sales_list is None:
+            self.sales_list = ctk.CTkFrame(self.container, fg_color="transparent")
+            self.kept_views.add(self.sales_list)
+        # Start over from the newest sale, reusing the pills of the last visit
+        for page in self.sales_pages:
+            for pill in page["pills"] or []: pill.frame.pack_forget()
+            self.free_pills.extend(page["pills"] or [])
+            if page["spacer"]: page["spacer"].destroy()
+        self.sales_pages, self.sales_done = [], False
+        self.sales_list.pack(fill="x")
+        self.container._parent_canvas.yview_moveto(0)
+        self.load_sales_page()
+        self.sales_watch = self.after(self.scroll_poll_ms, self.watch_sales_scroll)
+
+    def load_sales_page(self):
+        """Appends the next SALES_PAGE_SIZE older sales to Transaction Records."""
+        before = self.sales_pages[-1]["rows"][-1][0] if self.sales_pages else None
+        rows = self.db.fetch_sales_page(before)
+        self.sales_done = len(rows) < SALES_PAGE_SIZE
+        if rows:
+            page = {"rows": rows, "pills": None, "spacer": None}
+            self.sales_pages.append(page)
+            self.render_sales_page(page)
+
+    def watch_sales_scroll(self):
+        """Polls the scroll position: loads the next page near the bottom and
+        recycles the pills of pages more than a screen out of view."""
+        self.update_idletasks() # Pills packed since the last poll need their geometry
+        canvas = self.container._parent_canvas
+        view = canvas.winfo_height()
+        top = canvas.canvasy(0) - self.sales_list.winfo_y()
+        for page in self.sales_pages:
+            y0, y1 = self.sales_page_extent(page)
+            near = y1 >= top - view and y0 <= top + 2 * view
+            if near and page["pills"] is None: self.render_sales_page(page)
+            elif not near and page["pills"] is not None: self.release_sales_page(page)
+        if not self.sales_done and canvas.yview()[1] > 0.9: self.load_sales_page()
+        self.sales_watch = self.after(self.scroll_poll_ms, self.watch_sales_scroll)
+
+    def sales_page_extent(self, page):
+        """(top, bottom) of a page inside sales_list, including the pills' padding."""
+        if page["pills"] is None:
+            return page["spacer"].winfo_y(), page["spacer"].winfo_y() + page["spacer"].winfo_height()
+        first, last = page["pills"][0].frame, page["pills"][-1].frame
+        pad = 8 * ctk.ScalingTracker.get_widget_scaling(self) # SalePill's pady, scaled like CTk does
+        return first.winfo_y() - pad, last.winfo_y() + last.winfo_height() + pad
+
+    def render_sales_page(self, page):
+        spacer = page["spacer"] # Packed where the page was, if it was released before
+        page["pills"] = [self.free_pills.pop() if self.free_pills else SalePill(self, self.sales_list) for _ in page["rows"]]
+        for pill, sale in zip(page["pills"], page["rows"]): pill.show(sale, before=spacer)
+        if spacer: spacer.pack_forget()
+
+    def release_sales_page(self, page):
+        y0, y1 = self.sales_page_extent(page)
+        if page["spacer"] is None: page["spacer"] = ctk.CTkFrame(self.sales_list, fg_color="transparent")
+        # CTk scales the height it is given; winfo_* are already in pixels
+        page["spacer"].configure(height=(y1 - y0) / ctk.ScalingTracker.get_widget_scaling(self))
+        page["spacer"].pack(fill="x", before=page["pills"][0].frame)
+        for pill in page["pills"]: pill.frame.pack_forget()
+        self.free_pills.extend(page["pills"])
+        page["pills"] = None
+
+    def add_cart_row(self, name, data):
+        """Builds the widgets of one cart line; later changes only reconfigure its quantity label."""
+        row = ctk.CTkFrame(self.cart_scroll, fg_color="#F8F8F8", corner_radius=12, border_width=self.b_width, border_color="#E5E5E5")
+        row.pack(fill="x", pady=4, padx=5)
+        ctk.CTkButton(row, text="🗑️", width=30, height=30, fg_color="transparent", text_color="#FF3B30", command=lambda n=name: self.delete_from_cart(n)).pack(side="left", padx=8)
         
-        self.tax_lbl.configure(text=f"Tax (12%): ₱{(subtotal * self.tax_rate):,.2f}")
-        self.total_lbl.configure(text=f"₱{(subtotal * 1.12):,.2f}")
+        info = ctk.CTkFrame(row, fg_color="transparent")
+        info.pack(side="left", fill="both", expand=True, padx=5, pady=8)
+        ctk.CTkLabel(info, text=name, font=("SF Pro", 12, "bold"), anchor="w").pack(fill="x")
+        ctk.CTkLabel(info, text=f"₱{data['price']:,.2f}", font=("SF Pro", 11), text_color=self.primary_green, anchor="w").pack(fill="x")
+        
+        ctrl = ctk.CTkFrame(row, fg_color="white", corner_radius=6)
+        ctrl.pack(side="right", padx=8)
+        ctk.CTkButton(ctrl, text="−", width=24, height=24, fg_color=self.primary_green, command=lambda n=name, p=data['price'], i=data['id']: self.update_cart(n, p, -1, i)).pack(side="left")
+        data['qty_lbl'] = ctk.CTkLabel(ctrl, text=str(data['qty']), font=("SF Pro", 11, "bold"), width=22)
+        data['qty_lbl'].pack(side="left")
+        ctk.CTkButton(ctrl, text="+", width=24, height=24, fg_color=self.primary_green, command=lambda n=name, p=data['price'], i=data['id']: self.update_cart(n, p, 1, i)).pack(side="left")
+        data['row'] = row
+
+    def cart_totals(self):
+        """(tax, total) of the running subtotal, tax rounded to the centavo."""
+        tax = (self.subtotal * self.tax_rate).quantize(Decimal("0.01"))
+        return tax, self.subtotal + tax
+
+    def update_totals(self):
+        tax, total = self.cart_totals()
+        self.tax_lbl.configure(text=f"Tax (12%): ₱{tax:,.2f}")
+        self.total_lbl.configure(text=f"₱{total:,.2f}")
 
     def update_cart(self, n, p, d, i):
-        if n in self.cart:
-            self.cart[n]['qty'] += d
-            if self.cart[n]['qty'] <= 0: del self.cart[n]
-        elif d > 0: self.cart[n] = {'price': float(p), 'qty': 1, 'id': i}
-        self.render_cart()
+        if n not in self.cart:
+            if d <= 0: return
+            self.cart[n] = {'price': Decimal(str(p)), 'qty': 0, 'id': i}
+            self.add_cart_row(n, self.cart[n])
+        data = self.cart[n]
+        data['qty'] += d
+        self.subtotal += data['price'] * d
+        if data['qty'] <= 0: data['row'].destroy(); del self.cart[n]
+        else: data['qty_lbl'].configure(text=str(data['qty']))
+        self.update_totals()
 
     def open_filter_menu(self):
         m = ctk.CTkToplevel(self)
@@ -267,60 +447,61 @@ class MainApp(ctk.CTk):
         new_price = simpledialog.askfloat("Edit Product", f"New price for {item[1]}:", initialvalue=item[2])
         if new_price:
             self.db.execute_query("UPDATE products SET price=%s WHERE id=%s", (new_price, item[0]))
+            self.refresh_catalog()
             self.show_inventory_manager()
 
     def delete_item(self, pid):
         if messagebox.askyesno("Confirm", "Permanently delete this product?"):
             self.db.execute_query("DELETE FROM products WHERE id=%s", (pid,))
+            self.refresh_catalog()
             self.show_inventory_manager()
 
     def checkout(self):
         if not self.cart: 
             return messagebox.showwarning("POS", "Cart is empty!")
     
+        total = self.cart_totals()[1]
         try:
-        # 1. Pre-Check: Verify all items have sufficient stock
-            items_in_db = {item[0]: item for item in self.db.fetch_menu_items()} #
-        
-            for item_name, item_data in self.cart.items():
-                pid = item_data['id']
-                requested_qty = item_data['qty']
-                current_stock = items_in_db[pid][3] # Index 3 is stock column
-            
-                if requested_qty > current_stock:
-                    messagebox.showerror("Stock Error", 
-                        f"Insufficient stock for {item_name}.\n"
-                        f"Requested: {requested_qty}\n"
-                        f"Available: {current_stock}")
-                    return # Stop the checkout entirely
-
-        # 2. Process Checkout (Only if stock is sufficient)
-            summary = ", ".join([f"{v['qty']}x {k}" for k,v in self.cart.items()])
-            total = sum([v['qty'] * v['price'] for v in self.cart.values()]) * 1.12 #
-        
-            for item_name, item_data in self.cart.items():
-                self.db.update_stock(item_data['id'], -item_data['qty']) #[cite: 3]
-            
-            self.db.add_sale(datetime.now().strftime("%Y-%m-%d %H:%M"), summary, total) #[cite: 3]
-        
-            messagebox.showinfo("POS", "Transaction Completed!")
-            self.cart = {}
-            self.render_cart()
-            self.show_dashboard()
-        
+            # Stock check, stock update and sale in one transaction
+            self.db.checkout([(v['id'], v['qty'], v['price']) for v in self.cart.values()],
+                             datetime.now().replace(microsecond=0), total)
+        except OutOfStockError as e:
+            names = {v['id']: k for k, v in self.cart.items()}
+            messagebox.showerror("Stock Error", "Insufficient stock for:\n" + "\n".join(
+                f"{names[pid]} (requested: {want}, available: {have})"
+                for pid, (want, have) in e.shortages.items()))
+            self.refresh_catalog() # Another terminal sold it; show the real stock
+            return # Nothing was sold
         except Exception as e:
-            messagebox.showerror("Error", f"Checkout failed: {e}")
+            return messagebox.showerror("Error", f"Checkout failed: {e}")
+
+        messagebox.showinfo("POS", "Transaction Completed!")
+        self.refresh_catalog()
+        for data in self.cart.values(): data['row'].destroy()
+        self.cart, self.subtotal = {}, Decimal("0")
+        self.update_totals()
+        self.show_dashboard()
 
-    def adjust_stock(self, pid, d): self.db.update_stock(pid, d); self.show_inventory_manager()
+    def adjust_stock(self, pid, d): self.db.update_stock(pid, d); self.refresh_catalog(); self.show_inventory_manager()
     def toggle_category(self, cid): self.expanded_categories[cid] = not self.expanded_categories[cid]; self.show_inventory_manager()
     def delete_from_cart(self, name): 
-        if name in self.cart: del self.cart[name]
-        self.render_cart()
-    def clear_view(self): [c.destroy() for c in self.container.winfo_children()]
+        if name in self.cart:
+            data = self.cart.pop(name)
+            data['row'].destroy()
+            self.subtotal -= data['price'] * data['qty']
+        self.update_totals()
+    def clear_view(self):
+        if self.sales_watch: self.after_cancel(self.sales_watch); self.sales_watch = None
+        for c in self.container.winfo_children():
+            if c in self.kept_views: c.pack_forget()
+            else: c.destroy()
     def update_nav(self, txt):
         for n, b in self.nav_btns.items():
             act = (n == txt)
             b.configure(fg_color=self.primary_green if act else "transparent", text_color="white" if act else "black")
 
 if __name__ == "__main__": 
-    MainApp().mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Bean & Brew POS System")
+    parser.add_argument("--no-create-schema", dest="create_schema", action="store_false",
+                        help="skip the CREATE TABLE statements, e.g. when sqldata.sql has already been run")
+    MainApp(create_schema=parser.parse_args().create_schema).mainloop()
\ No newline at end of file
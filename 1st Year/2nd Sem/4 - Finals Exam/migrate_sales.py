@@ -0,0 +1,17 @@
+"""
+Upgrades a cafe_management database made by the old sqldata.sql: the
+sales.items text becomes sale_items rows and sales.date a DATETIME.
+
+    python migrate_sales.py
+"""
+from database import DatabaseManager
+
+if __name__ == "__main__":
+    db = DatabaseManager(create_schema=False)
+    unmatched = db.migrate_sales()
+    if unmatched:
+        print("These lines name products that no longer exist; sales.items was kept:")
+        for sale_id, name in unmatched:
+            print(f"  Order #{sale_id}: {name}")
+    else:
+        print("Sales migrated.")
@@ -6,6 +6,9 @@ CREATE DATABASE IF NOT EXISTS cafe_management;
 USE cafe_management;
 
 -- Clean slate to prevent name conflicts
+-- (to keep the sales of a database made by the old script, run
+-- `python migrate_sales.py` instead of this file)
+DROP TABLE IF EXISTS sale_items;
 DROP TABLE IF EXISTS sales;
 DROP TABLE IF EXISTS transactions;
 DROP TABLE IF EXISTS products;
@@ -31,9 +34,21 @@ CREATE TABLE products (
 -- 3. Sales (Using the structure your Python checkout needs)
 CREATE TABLE sales (
     id     INT AUTO_INCREMENT PRIMARY KEY,
-    date   VARCHAR(255) NOT NULL,
-    items  TEXT NOT NULL,
-    total  DECIMAL(10, 2) NOT NULL
+    date   DATETIME NOT NULL,
+    total  DECIMAL(10, 2) NOT NULL,
+    INDEX idx_sales_date (date)
+);
+
+-- 3b. Sale lines: one row per product in a sale, at the price it was sold for
+CREATE TABLE sale_items (
+    sale_id     INT            NOT NULL,
+    product_id  INT            NOT NULL,
+    qty         INT            NOT NULL,
+    unit_price  DECIMAL(10,2)  NOT NULL,
+    PRIMARY KEY (sale_id, product_id),
+    INDEX idx_sale_items_product (product_id),
+    CONSTRAINT fk_sale FOREIGN KEY (sale_id)
+        REFERENCES sales(id) ON DELETE CASCADE
 );
 
 -- 4. Categories Seed